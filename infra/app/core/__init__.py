@@ -1,3 +1,3 @@
-from app.core.models import Video, EncodingJob, Worker, ENTITY_TYPE
+from app.core.models import Video, EncodingJob, Worker, WorkerMetric, ENTITY_TYPE
 from app.core.config import Settings
-__all_ = ["Settings", "Video", "EncodingJob", "Worker", "ENTITY_TYPE"]
\ No newline at end of file
+__all_ = ["Settings", "Video", "EncodingJob", "Worker", "WorkerMetric", "ENTITY_TYPE"]
\ No newline at end of file
@@ -1,20 +1,112 @@
-import os
+import os, socket
 
 class Settings:
     REDIS_URL : str = os.environ.get('CELERY_BROKER_URL', 'redis://redis:6379/0')
     WORKER_NAME : str = os.environ.get("WORKER_NAME", 'worker_0')
+    # 워커 선택 점수: (cpu + memory) / 2 + 대기 작업 수 * QUEUED_JOB_WEIGHT, 과부하 워커는 WORKER_OVERLOAD_SCORE 이상
+    QUEUED_JOB_WEIGHT: float = float(os.getenv("QUEUED_JOB_WEIGHT", "25"))
+    WORKER_OVERLOAD_SCORE: float = float(os.getenv("WORKER_OVERLOAD_SCORE", "1000"))
+    # 워커 동시 작업 슬롯: WORKER_SLOTS(0 이면 코어/메모리 기준 자동), 작업 비용은 화질 사다리 픽셀 수 기준
+    WORKER_SLOTS: int = int(os.getenv("WORKER_SLOTS", "0"))
+    CORES_PER_SLOT: int = int(os.getenv("CORES_PER_SLOT", "4"))
+    MEMORY_GB_PER_SLOT: int = int(os.getenv("MEMORY_GB_PER_SLOT", "4"))
+    SLOT_1080P_RUNGS: float = float(os.getenv("SLOT_1080P_RUNGS", "2"))
+    # 슬롯 점유 임대 시간(하트비트가 연장) 과 대기 중 만료 임대 점검 주기
+    SLOT_LEASE_SECONDS: int = int(os.getenv("SLOT_LEASE_SECONDS", "30"))
+    SLOT_WAIT_SECONDS: int = int(os.getenv("SLOT_WAIT_SECONDS", "5"))
+    # 하트비트 주기(초)와 임시 작업 디렉터리 최소 여유 공간(GB, 미만이면 과부하로 보고)
+    HEARTBEAT_INTERVAL: float = float(os.getenv("HEARTBEAT_INTERVAL", "3"))
+    SCRATCH_MIN_FREE_GB: float = float(os.getenv("SCRATCH_MIN_FREE_GB", "5"))
+    # 하트비트는 Redis 에만 기록, METRICS_FLUSH_INTERVAL 주기로 worker_metrics 에 일괄 적재 후 1m/1h 집계
+    METRICS_FLUSH_INTERVAL: float = float(os.getenv("METRICS_FLUSH_INTERVAL", "60"))
+    METRICS_RAW_RETENTION_HOURS: int = int(os.getenv("METRICS_RAW_RETENTION_HOURS", "24"))
+    METRICS_MINUTE_RETENTION_DAYS: int = int(os.getenv("METRICS_MINUTE_RETENTION_DAYS", "7"))
+    METRICS_HOUR_RETENTION_DAYS: int = int(os.getenv("METRICS_HOUR_RETENTION_DAYS", "90"))
+    # 작업 진행률: 변화량(%) 과 간격(초) 을 모두 넘을 때만 Redis 에 기록, PROGRESS_FLUSH_INTERVAL 주기로 DB 일괄 반영
+    PROGRESS_MIN_DELTA: int = int(os.getenv("PROGRESS_MIN_DELTA", "1"))
+    PROGRESS_MIN_INTERVAL: float = float(os.getenv("PROGRESS_MIN_INTERVAL", "1"))
+    PROGRESS_FLUSH_INTERVAL: float = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "10"))
+    # ffmpeg 출력 시간이 이 시간(초) 동안 늘지 않으면 정체로 표시
+    FFMPEG_STALL_SECONDS: float = float(os.getenv("FFMPEG_STALL_SECONDS", "60"))
+    # 이 시간(초) 동안 늘지 않으면 ffmpeg 를 종료해 작업을 실패 처리 (0 이면 종료하지 않음)
+    FFMPEG_KILL_SECONDS: float = float(os.getenv("FFMPEG_KILL_SECONDS", "900"))
 
     AWS_ACCESS_KEY: str = os.getenv("AWS_ACCESS_KEY", "test")
     AWS_SECRET_KEY: str = os.getenv("AWS_SECRET_KEY", "test")
     S3_ENDPOINT: str = os.getenv("S3_ENDPOINT", "http://localstack:4566")
 
+    # S3 전송 튜닝 (스레드 풀, 커넥션 풀, 멀티파트 기준)
+    S3_TRANSFER_WORKERS: int = int(os.getenv("S3_TRANSFER_WORKERS", "16"))
+    S3_MAX_POOL_CONNECTIONS: int = int(os.getenv("S3_MAX_POOL_CONNECTIONS", "32"))
+    S3_MAX_CONCURRENCY: int = int(os.getenv("S3_MAX_CONCURRENCY", "8"))
+    S3_MULTIPART_THRESHOLD_MB: int = int(os.getenv("S3_MULTIPART_THRESHOLD_MB", "16"))
+    S3_MULTIPART_CHUNKSIZE_MB: int = int(os.getenv("S3_MULTIPART_CHUNKSIZE_MB", "16"))
+
     UPLOAD_BUCKET_NAME = 'upload-bucket'
     HLS_BUCKET_NAME = 'hls-bucket'
-    REDIS_PREFIX = "s3_file:"
+    # 게시 목록: HLS 버킷의 CATALOG_PREFIX 아래 index.json + 페이지(CATALOG_PAGE_SIZE 개) 단위 m3u8/json
+    CATALOG_PREFIX: str = os.getenv("CATALOG_PREFIX", "catalog/")
+    CATALOG_PAGE_SIZE: int = int(os.getenv("CATALOG_PAGE_SIZE", "500"))
+    REDIS_PREFIX = "s3_files:"
+    UPLOAD_STATE_RETENTION_DAYS: int = int(os.getenv("UPLOAD_STATE_RETENTION_DAYS", "30"))
+
+    # 업로드 감지 방식: events(S3 알림 -> SQS -> Redis Stream) / poll(2초 주기 목록 조회)
+    INGEST_MODE: str = os.getenv("INGEST_MODE", "events")
+    WATCHER_NAME: str = os.getenv("WATCHER_NAME", socket.gethostname())
+    UPLOAD_EVENT_QUEUE: str = os.getenv("UPLOAD_EVENT_QUEUE", "upload-events")
+    INGEST_STREAM: str = "ingest:events"
+    # 이벤트 누락 대비 전체 점검 주기와 페이지 크기
+    RECONCILE_INTERVAL: int = int(os.getenv("RECONCILE_INTERVAL", "300"))
+    RECONCILE_PAGE_SIZE: int = int(os.getenv("RECONCILE_PAGE_SIZE", "1000"))
+
+    # 같은 내용(ETag + 인코딩 프로파일) 재업로드 처리: pointer(기존 hls_path 공유) / copy(S3 서버 측 복사) / off
+    DEDUPE_MODE: str = os.getenv("DEDUPE_MODE", "pointer")
+
+    # 원본 입력 방식: stream(Presigned GET URL 을 ffmpeg 에 직접 전달) / local(전체 다운로드 후 인코딩)
+    INPUT_MODE: str = os.getenv("INPUT_MODE", "stream")
+    INPUT_URL_EXPIRATION: int = int(os.getenv("INPUT_URL_EXPIRATION", "21600"))
+    INPUT_PROBE_SIZE: int = int(os.getenv("INPUT_PROBE_SIZE", str(5 * 1024 * 1024)))
+    # 탐색(seek) 이 많아 HTTP 입력이 비효율적인 형식은 로컬 복사로 처리
+    LOCAL_INPUT_EXTENSIONS: list[str] = os.getenv("LOCAL_INPUT_EXTENSIONS", "avi").split(",")
+
+    # ffprobe/복잡도 분석 결과의 ETag 기준 Redis 캐시 유지 시간
+    ETAG_CACHE_TTL: int = int(os.getenv("ETAG_CACHE_TTL", str(30 * 24 * 3600)))
+
+    # 콘텐츠 복잡도 분석 (샘플 구간 CRF 인코딩으로 화질별 비트레이트 배율 산정)
+    COMPLEXITY_ANALYSIS: bool = os.getenv("COMPLEXITY_ANALYSIS", "false").lower() == "true"
+    COMPLEXITY_SAMPLES: int = int(os.getenv("COMPLEXITY_SAMPLES", "5"))
+    COMPLEXITY_MIN_FACTOR: float = float(os.getenv("COMPLEXITY_MIN_FACTOR", "0.5"))
+    COMPLEXITY_MAX_FACTOR: float = float(os.getenv("COMPLEXITY_MAX_FACTOR", "1.5"))
+
+    # 긴 영상은 시간 단위 청크로 나눠 여러 워커에서 병렬 인코딩
+    CHUNKED_ENCODE: bool = os.getenv("CHUNKED_ENCODE", "true").lower() == "true"
+    CHUNK_MIN_DURATION: int = int(os.getenv("CHUNK_MIN_DURATION", "600"))
+    CHUNK_SECONDS: int = int(os.getenv("CHUNK_SECONDS", "120"))
+    # single: 한 ffmpeg 로 전체 화질 / renditions: RENDITION_GROUPS(사다리 단계 번호, ";" 로 묶음 구분) 묶음마다 별도 작업
+    ENCODE_MODE: str = os.getenv("ENCODE_MODE", "single")
+    # 묶음 작업마다 입력을 따로 준비하므로 local 입력(INPUT_MODE=local, 스트리밍 분석 실패) 은 묶음 수만큼 원본 전체를 다운로드
+    RENDITION_GROUPS: str = os.getenv("RENDITION_GROUPS", "0,1;2;3;4")
+    # muxed: 화질마다 오디오 포함 / group: AUDIO_GROUP_BITRATES 개수만큼 오디오를 따로 인코딩해 EXT-X-MEDIA 그룹으로 공유
+    AUDIO_MODE: str = os.getenv("AUDIO_MODE", "muxed")
+    AUDIO_GROUP_BITRATES: str = os.getenv("AUDIO_GROUP_BITRATES", "128k")
+    # ts: 2초 .ts 세그먼트 파일 / fmp4: 화질마다 CMAF 단일 파일 + EXT-X-BYTERANGE
+    SEGMENT_FORMAT: str = os.getenv("SEGMENT_FORMAT", "ts")
+
+    # 빠른 게시: 짧은 변 FAST_FIRST_MAX_HEIGHT 이하 화질을 먼저 게시하고 나머지는 낮은 우선순위 작업으로 추가
+    PROGRESSIVE_PUBLISH: bool = os.getenv("PROGRESSIVE_PUBLISH", "true").lower() == "true"
+    FAST_FIRST_MAX_HEIGHT: int = int(os.getenv("FAST_FIRST_MAX_HEIGHT", "720"))
+    # Redis 브로커 우선순위 (0 이 가장 높음)
+    BACKFILL_PRIORITY: int = int(os.getenv("BACKFILL_PRIORITY", "9"))
 
     DB_URL: str = os.getenv("DATABASE_URL", "postgresql://encoder:encoder@db:5432/encoder")
     DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
     DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    # manager(FastAPI) 전용 비동기 드라이버(asyncpg) 접속 주소
+    ASYNC_DB_URL: str = os.getenv("ASYNC_DATABASE_URL", DB_URL.replace("postgresql://", "postgresql+asyncpg://", 1))
+
+    # 목록 API 전체 개수 캐시 (매 요청 COUNT(*) 대신 Redis 에 TTL 동안 보관)
+    API_COUNT_CACHE_SECONDS: int = int(os.getenv("API_COUNT_CACHE_SECONDS", "10"))
+    API_MAX_PAGE_SIZE: int = int(os.getenv("API_MAX_PAGE_SIZE", "100"))
 
     CORS_ORIGINS: list[str] = [
         "http://127.0.0.1",
@@ -8,6 +8,8 @@ engine = None
 api_engine = None
 SessionLocal = None
 SessionLocalApi = None
+async_api_engine = None
+AsyncSessionLocalApi = None
 Base = declarative_base()
 
 def setup_database_connections():
@@ -48,3 +50,27 @@ def get_api_db():
         yield db
     finally:
         db.close()
+
+def setup_async_database():
+    """manager 전용 asyncpg 엔진: DB 응답 대기 중에도 이벤트 루프가 다른 요청을 처리"""
+    global async_api_engine, AsyncSessionLocalApi
+    # greenlet/asyncpg 는 manager 이미지에만 설치되므로 워커/감시 프로세스에서는 불러오지 않음
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    async_api_engine = create_async_engine(
+        Settings.ASYNC_DB_URL,
+        pool_size=Settings.DB_POOL_SIZE,
+        max_overflow=Settings.DB_MAX_OVERFLOW,
+        pool_timeout=30,
+        pool_recycle=1800,
+        pool_pre_ping=True,
+    )
+    AsyncSessionLocalApi = async_sessionmaker(bind=async_api_engine, autoflush=False, expire_on_commit=False)
+
+async def dispose_async_database():
+    if async_api_engine is not None:
+        await async_api_engine.dispose()
+
+async def get_async_api_db():
+    async with AsyncSessionLocalApi() as db:
+        yield db
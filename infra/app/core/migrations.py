@@ -0,0 +1,69 @@
+from sqlalchemy import text, UniqueConstraint
+
+from app.core.database import Base
+import app.core.models  # noqa: F401 (테이블 메타데이터 등록)
+
+# 유니크 제약 추가 전 기존 중복 정리: videos 는 최신 행만 남기고 작업을 그 행으로 옮김, workers 는 최신 하트비트만 남김
+DEDUPE_STATEMENTS = (
+    """
+    WITH ranked AS (
+        SELECT id, first_value(id) OVER (PARTITION BY original_path, s3_etag ORDER BY created_at DESC, id) AS keep_id
+        FROM videos
+    )
+    UPDATE encoding_jobs AS job SET video_id = ranked.keep_id
+    FROM ranked WHERE job.video_id = ranked.id AND ranked.id <> ranked.keep_id
+    """,
+    """
+    DELETE FROM videos WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (PARTITION BY original_path, s3_etag ORDER BY created_at DESC, id) AS n
+            FROM videos
+        ) AS ranked WHERE n > 1
+    )
+    """,
+    """
+    DELETE FROM workers WHERE id IN (
+        SELECT id FROM (
+            SELECT id, row_number() OVER (PARTITION BY hostname ORDER BY last_heartbeat DESC, id) AS n
+            FROM workers
+        ) AS ranked WHERE n > 1
+    )
+    """,
+)
+
+def _constraint_name(constraint: UniqueConstraint) -> str:
+    # 이름 없는 column unique=True 는 PostgreSQL 기본 이름(<table>_<column>_key) 사용
+    if constraint.name:
+        return constraint.name
+    return f"{constraint.table.name}_{'_'.join(column.name for column in constraint.columns)}_key"
+
+def apply_schema(engine):
+    """기존 DB 에 모델 변경분 반영 (여러 번 실행해도 같은 결과)
+
+    새 테이블은 create_all 로 만들고, 기존 테이블에 추가된 유니크 제약/인덱스는 없을 때만 생성합니다.
+    """
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('apply_schema'))"))
+        existing = set(conn.execute(text("SELECT conname FROM pg_constraint")).scalars())
+        missing = [
+            constraint for table in Base.metadata.sorted_tables for constraint in table.constraints
+            if isinstance(constraint, UniqueConstraint) and _constraint_name(constraint) not in existing
+        ]
+        if missing:
+            for statement in DEDUPE_STATEMENTS:
+                conn.execute(text(statement))
+        for constraint in missing:
+            columns = ", ".join(column.name for column in constraint.columns)
+            conn.execute(text(
+                f'ALTER TABLE {constraint.table.name} ADD CONSTRAINT {_constraint_name(constraint)} UNIQUE ({columns})'
+            ))
+            print(f"유니크 제약 추가: {_constraint_name(constraint)}", flush=True)
+
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+if __name__ == "__main__":
+    from app.core.database import engine
+    apply_schema(engine)
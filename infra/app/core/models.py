@@ -1,5 +1,5 @@
 import uuid
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, BigInteger, Float, DateTime, ForeignKey, Index, UniqueConstraint, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -8,6 +8,14 @@ from app.core.enum import VideoStatus, JobStatus, WorkerStatus
 
 class Video(Base):
     __tablename__ = "videos"
+    __table_args__ = (
+        UniqueConstraint("original_path", "s3_etag", name="uq_videos_original_path_s3_etag"),
+        # 목록 API 커서 페이지네이션 (최신순, 상태 필터)
+        Index("ix_videos_created_at_id", "created_at", "id"),
+        Index("ix_videos_status_created_at_id", "status", "created_at", "id"),
+        # 같은 내용(ETag) 의 기존 분석/인코딩 결과 조회 (유니크 제약은 original_path 로 시작해 사용 불가)
+        Index("ix_videos_s3_etag_status", "s3_etag", "status"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     s3_etag = Column(String(255), nullable=False)
@@ -21,6 +29,12 @@ class Video(Base):
 
 class EncodingJob(Base):
     __tablename__ = "encoding_jobs"
+    __table_args__ = (
+        # 목록 API 커서 페이지네이션 (최신순, 상태/워커 필터)
+        Index("ix_encoding_jobs_started_at_id", "started_at", "id"),
+        Index("ix_encoding_jobs_status_started_at_id", "status", "started_at", "id"),
+        Index("ix_encoding_jobs_worker_started_at_id", "worker_id", "started_at", "id"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     video_id = Column(UUID(as_uuid=True), ForeignKey("videos.id"), index=True)
@@ -35,10 +49,31 @@ class Worker(Base):
     __tablename__ = "workers"
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    hostname = Column(String(255))
+    hostname = Column(String(255), unique=True, nullable=False)
     cpu_usage = Column(Integer, default=0)
     memory_usage = Column(Integer, default=0)
     status = Column(SQLEnum(WorkerStatus, native_enum=False, length=15), default=WorkerStatus.IDLE, index=True)
     last_heartbeat = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
+class WorkerMetric(Base):
+    __tablename__ = "worker_metrics"
+    __table_args__ = (
+        Index("ix_worker_metrics_lookup", "hostname", "resolution", "bucket"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    hostname = Column(String(255), nullable=False)
+    # raw(하트비트 원본) / 1m / 1h 집계
+    resolution = Column(String(4), nullable=False)
+    bucket = Column(DateTime(timezone=True), nullable=False)
+    cpu = Column(Float, default=0)
+    cpu_max = Column(Float, default=0)
+    memory = Column(Float, default=0)
+    memory_max = Column(Float, default=0)
+    rss_mb = Column(Float, default=0)
+    read_mb_per_second = Column(Float, default=0)
+    write_mb_per_second = Column(Float, default=0)
+    scratch_free_gb = Column(Float, default=0)
+    samples = Column(Integer, default=1)
+
 ENTITY_TYPE = TypeVar("ENTITY_TYPE", bound=Base)
\ No newline at end of file
@@ -33,6 +33,19 @@ class JobResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class JobProgressResponse(BaseModel):
+    job_id: str
+    progress: int
+    worker: Optional[str] = None
+    out_time_us: int = 0
+    frame: int = 0
+    fps: float = 0.0
+    speed: float = 0.0
+    bitrate_kbps: float = 0.0
+    total_size: int = 0
+    stalled: bool = False
+    updated_at: float
+
 class WorkerResponse(BaseModel):
     id: UUID
     hostname: str
@@ -44,10 +57,27 @@ class WorkerResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class WorkerMetricResponse(BaseModel):
+    bucket: datetime
+    cpu: float
+    cpu_max: float
+    memory: float
+    memory_max: float
+    rss_mb: float
+    read_mb_per_second: float
+    write_mb_per_second: float
+    scratch_free_gb: float
+    samples: int
+
+    class Config:
+        from_attributes = True
+
 class ResponsePage(BaseModel, Generic[T]):
+    # total 은 API_COUNT_CACHE_SECONDS 동안 캐시된 값 (근사치)
     total: int
-    page: int
     items: List[T]
+    # 다음 페이지 요청 시 cursor 로 전달, 마지막 페이지면 None
+    next_cursor: Optional[str] = None
 
 class VideoUploadRequest(BaseModel):
     filename: str
@@ -1,29 +1,75 @@
-import uuid
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
+import uuid, json, base64, asyncio
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import Video, EncodingJob, Worker, Settings
-from app.core.database import get_api_db
-from app.manager.api.dto import ResponsePage, VideoResponse, JobResponse, WorkerResponse, VideoUploadRequest, PresignedUrlResponse
-from app.services.db_service import select_all_entity
+from app.core.database import get_async_api_db
+from app.core.enum import VideoStatus, JobStatus, WorkerStatus
+from app.manager.api.stream import event_stream
+from app.manager.api.dto import ResponsePage, VideoResponse, JobResponse, JobProgressResponse, WorkerResponse, WorkerMetricResponse, VideoUploadRequest, PresignedUrlResponse
+from app.services.db_service import select_page, count_entity, select_worker_metrics
 from app.services.s3_service import S3Service
+from app.worker.progress import read_progress_async
+from app.worker.redis_app import async_watch_state
 
 
 s3_service = S3Service()
 router = APIRouter()
 
-def convert_page(query, page, page_size):
-    if not query:
-        return ResponsePage(total=0, page=page, items=[])
-    
-    total_count = query.count()
-    items = query.offset((page - 1) * page_size).limit(page_size).all()
-    return ResponsePage(total=total_count, page=page, items=items)
+METRIC_RESOLUTIONS = ("raw", "1m", "1h")
+
+COUNT_CACHE_PREFIX = "count:api:"
+
+def encode_cursor(row, order_columns) -> str:
+    values = [getattr(row, column.key) for column in order_columns]
+    raw = json.dumps([value.isoformat() if isinstance(value, datetime) else str(value) for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str, order_columns) -> tuple:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        converted = []
+        for column, value in zip(order_columns, values, strict=True):
+            python_type = column.type.python_type
+            converted.append(datetime.fromisoformat(value) if python_type is datetime else python_type(value))
+        return tuple(converted)
+    except Exception:
+        raise HTTPException(status_code=400, detail="잘못된 cursor 입니다.")
+
+async def cached_total(entity_class, filters: dict, db: AsyncSession) -> int:
+    # 매 요청 COUNT(*) 대신 필터 조합별로 짧게 캐시
+    key = COUNT_CACHE_PREFIX + entity_class.__tablename__ + ":" + ",".join(f"{k}={getattr(v, 'value', v)}" for k, v in sorted(filters.items()))
+    try:
+        cached = await async_watch_state.get(key)
+        if cached is not None:
+            return int(cached)
+    except Exception as e:
+        print(f"개수 캐시 조회 에러: {e}", flush=True)
+        return await count_entity(entity_class, filters, db)
+
+    total = await count_entity(entity_class, filters, db)
+    await async_watch_state.set(key, total, ex=Settings.API_COUNT_CACHE_SECONDS)
+    return total
+
+async def convert_page(entity_class, order_columns, filters: dict, cursor: str | None, page_size: int, db: AsyncSession):
+    """(정렬 컬럼..., id) 키셋 페이지: OFFSET 없이 cursor 다음 행부터 조회"""
+    if page_size < 1 or page_size > Settings.API_MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"page_size 는 1 ~ {Settings.API_MAX_PAGE_SIZE} 사이여야 합니다.")
+    filters = {k: v for k, v in filters.items() if v is not None}
+    after = decode_cursor(cursor, order_columns) if cursor else None
+
+    items, has_next = await select_page(entity_class, order_columns, filters, after, page_size, db)
+    next_cursor = encode_cursor(items[-1], order_columns) if has_next else None
+    return ResponsePage(total=await cached_total(entity_class, filters, db), items=items, next_cursor=next_cursor)
 
 @router.get("/videos", response_model=ResponsePage[VideoResponse])
-def get_videos(page: int = 1, page_size: int = 10, db: Session = Depends(get_api_db)):
+async def get_videos(cursor: Optional[str] = None, page_size: int = 10, status: Optional[VideoStatus] = None, db: AsyncSession = Depends(get_async_api_db)):
     try:
-        query = select_all_entity(Video, db=db)
-        return convert_page(query, page, page_size)
+        return await convert_page(Video, [Video.created_at, Video.id], {"status": status}, cursor, page_size, db)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting videos: {e}", flush=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
@@ -39,26 +85,71 @@ async def get_video_upload_url(request: VideoUploadRequest):
     # S3에 저장될 파일 경로를 유니크하게 생성합니다.
     object_key = f"upload/{uuid.uuid4()}.{file_ext}"
 
-    upload_url = s3_service.create_presigned_url_for_put(Settings.UPLOAD_BUCKET_NAME, object_key)
+    # boto3 는 동기 클라이언트이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+    upload_url = await asyncio.to_thread(s3_service.create_presigned_url_for_put, Settings.UPLOAD_BUCKET_NAME, object_key)
     if not upload_url:
         raise HTTPException(status_code=500, detail="업로드 URL 생성에 실패했습니다.")
 
     return PresignedUrlResponse(upload_url=upload_url, object_key=object_key)
 
 @router.get("/jobs", response_model=ResponsePage[JobResponse])
-def get_jobs(page: int = 1, page_size: int = 10, db: Session = Depends(get_api_db)):
+async def get_jobs(cursor: Optional[str] = None, page_size: int = 10, status: Optional[JobStatus] = None,
+                   worker_id: Optional[str] = None, db: AsyncSession = Depends(get_async_api_db)):
     try:
-        query = select_all_entity(EncodingJob, db=db)
-        return convert_page(query, page, page_size)
+        result = await convert_page(
+            EncodingJob, [EncodingJob.started_at, EncodingJob.id],
+            {"status": status, "worker_id": worker_id}, cursor, page_size, db
+        )
+        # 인코딩 중인 작업은 Redis 의 실시간 진행률 우선
+        live = await read_progress_async([str(job.id) for job in result.items])
+        result.items = [
+            JobResponse.model_validate(job).model_copy(update={"progress": int(live[str(job.id)]["progress"])})
+            if str(job.id) in live else job
+            for job in result.items
+        ]
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting jobs: {e}", flush=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+@router.get("/jobs/{job_id}/progress", response_model=JobProgressResponse)
+async def get_job_progress(job_id: str):
+    # 인코딩 중인 작업의 실시간 진행 정보 (fps, speed, bitrate 등)
+    live = (await read_progress_async([job_id])).get(job_id)
+    if not live:
+        raise HTTPException(status_code=404, detail="진행 중인 작업이 아닙니다.")
+    return JobProgressResponse(job_id=job_id, **{**live, "stalled": live.get("stalled") == "1"})
+
+@router.get("/events")
+async def stream_events(request: Request):
+    # 작업 진행률/상태 변경/워커 하트비트 변경분을 SSE 로 전달 (type: video, job, progress, worker)
+    return StreamingResponse(
+        event_stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/workers", response_model=ResponsePage[WorkerResponse])
-def get_workers(page: int = 1, page_size: int = 10, db: Session = Depends(get_api_db)):
+async def get_workers(cursor: Optional[str] = None, page_size: int = 10, status: Optional[WorkerStatus] = None, db: AsyncSession = Depends(get_async_api_db)):
     try:
-        query = select_all_entity(Worker, db=db)
-        return convert_page(query, page, page_size)
+        # hostname 유니크 제약 인덱스로 정렬
+        return await convert_page(Worker, [Worker.hostname], {"status": status}, cursor, page_size, db)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error getting workers: {e}", flush=True)
         raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+@router.get("/workers/{hostname}/metrics", response_model=List[WorkerMetricResponse])
+async def get_worker_metrics(hostname: str, resolution: str = "1m", hours: int = 24, db: AsyncSession = Depends(get_async_api_db)):
+    if resolution not in METRIC_RESOLUTIONS:
+        raise HTTPException(status_code=400, detail=f"resolution 은 {', '.join(METRIC_RESOLUTIONS)} 중 하나여야 합니다.")
+    try:
+        since = datetime.now(timezone.utc) - timedelta(hours=hours)
+        return await select_worker_metrics(hostname, resolution, since, db)
+    except Exception as e:
+        print(f"Error getting worker metrics: {e}", flush=True)
+        raise HTTPException(status_code=500, detail="Internal Server Error")
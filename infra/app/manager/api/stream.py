@@ -0,0 +1,66 @@
+import asyncio
+
+from app.worker.events import EVENTS_CHANNEL
+from app.worker.redis_app import async_watch_state
+
+KEEPALIVE_SECONDS = 15
+CLIENT_QUEUE_SIZE = 1000
+# 연결이 끊긴 뒤 EventSource 재접속 대기 시간(ms)
+RETRY_MILLISECONDS = 3000
+
+class EventBroadcaster:
+    """프로세스당 Redis 구독 1개를 모든 SSE 연결에 나눠 전달 (대시보드 접속 수와 관계없이 Redis/DB 부하 일정)"""
+
+    def __init__(self):
+        self.clients: set[asyncio.Queue] = set()
+        self.task: asyncio.Task | None = None
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=CLIENT_QUEUE_SIZE)
+        self.clients.add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self._listen())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.clients.discard(queue)
+
+    def _broadcast(self, message: str):
+        for queue in list(self.clients):
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # 따라오지 못하는 연결은 끊고 재접속 시 목록을 다시 받도록 함
+                self.clients.discard(queue)
+
+    async def _listen(self):
+        # 연결된 대시보드가 없으면 구독 종료
+        while self.clients:
+            try:
+                async with async_watch_state.pubsub() as pubsub:
+                    await pubsub.subscribe(EVENTS_CHANNEL)
+                    while self.clients:
+                        message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                        if message:
+                            self._broadcast(message["data"])
+            except Exception as e:
+                print(f"이벤트 구독 에러: {e}", flush=True)
+                await asyncio.sleep(1)
+
+broadcaster = EventBroadcaster()
+
+async def event_stream(request):
+    queue = broadcaster.subscribe()
+    try:
+        yield f"retry: {RETRY_MILLISECONDS}\n\n"
+        while queue in broadcaster.clients:
+            if await request.is_disconnected():
+                break
+            try:
+                message = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                yield f"data: {message}\n\n"
+            except asyncio.TimeoutError:
+                # 프록시 유휴 연결 종료 방지
+                yield ": keepalive\n\n"
+    finally:
+        broadcaster.unsubscribe(queue)
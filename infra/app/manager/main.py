@@ -3,13 +3,16 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.core import Settings
 from app.manager.api import endpoints
-from app.core.database import Base, engine
+from app.core.database import engine, setup_async_database, dispose_async_database
+from app.core.migrations import apply_schema
 from app.services.db_service import set_service_type
 from app.services.s3_service import S3Service
 
 set_service_type('api')
+setup_async_database()
 
-Base.metadata.drop_all(bind=engine)
+# 기존 데이터를 유지한 채 모델 변경분(테이블, 유니크 제약, 인덱스) 반영
+apply_schema(engine)
 
 app = FastAPI(title="Video Transcoder API")
 
@@ -24,6 +27,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await dispose_async_database()
+
 # API 경로 등록
 app.include_router(endpoints.router, prefix="/api/v1")
 
@@ -1,10 +1,17 @@
 from contextlib import contextmanager
-from importlib.metadata.diagnose import inspect
-
+from datetime import datetime, timedelta
+from sqlalchemy import insert, select, delete, func, literal, update, bindparam, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.orm import Session
-from app.core import Video, Worker, EncodingJob, ENTITY_TYPE
+from sqlalchemy.orm.attributes import set_committed_value
+from app.core import Video, Worker, WorkerMetric, EncodingJob, ENTITY_TYPE
 from app.core.database import SessionLocalApi, SessionLocal
-from typing import Type
+from app.core.enum import VideoStatus, JobStatus
+from typing import Type, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    # manager 전용 (워커 이미지에는 greenlet 미설치)
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 service_type : str = 'worker'
 
@@ -24,17 +31,29 @@ def session_scope():
     finally:
         session.close()
 
-def update_job_progress(job_id: str, progress: int):
-    with session_scope() as db:
-        job = db.query(EncodingJob).filter_by(id=job_id).first()
-        if job:
-            job.progress = progress
+def bulk_update_job_progress(rows: list[dict], db: Session):
+    # rows: [{"job_id", "new_progress"}], 인코딩 중인 작업만 갱신 (최종 상태가 기록된 작업은 덮어쓰지 않음)
+    if not rows:
+        return
+    table = EncodingJob.__table__
+    db.execute(
+        update(table)
+        .where(table.c.id == bindparam("job_id"), table.c.status == JobStatus.ENCODING, table.c.progress < bindparam("new_progress"))
+        .values(progress=bindparam("new_progress")),
+        rows
+    )
 
-def select_all_entity(entity_class : Type[ENTITY_TYPE], db: Session = None):
-    if db:
-        return db.query(entity_class)
-    with session_scope() as db:
-        return db.query(entity_class)
+async def select_page(entity_class : Type[ENTITY_TYPE], order_columns : list, filters : dict, after : tuple | None, limit : int, db: "AsyncSession"):
+    """키셋 페이지네이션: order_columns 내림차순으로 after 다음 limit 개 (다음 페이지 존재 여부 포함)"""
+    stmt = select(entity_class).filter_by(**filters)
+    if after:
+        stmt = stmt.where(tuple_(*order_columns) < tuple_(*after))
+    result = await db.execute(stmt.order_by(*[column.desc() for column in order_columns]).limit(limit + 1))
+    rows = result.scalars().all()
+    return rows[:limit], len(rows) > limit
+
+async def count_entity(entity_class : Type[ENTITY_TYPE], filters : dict, db: "AsyncSession") -> int:
+    return await db.scalar(select(func.count(entity_class.id)).filter_by(**filters))
 
 def select_entity(entity_class : Type[ENTITY_TYPE], uuid : str, db: Session = None):
     if db:
@@ -42,45 +61,134 @@ def select_entity(entity_class : Type[ENTITY_TYPE], uuid : str, db: Session = No
     with session_scope() as db:
         return db.query(entity_class).filter_by(id = uuid).first()
 
+def select_video_by_etag(etag: str, db: Session):
+    # 분석 결과(encoding_json.source) 가 기록된 같은 내용의 영상
+    return db.query(Video).filter(Video.s3_etag == etag, Video.encoding_json.has_key("source")) \
+        .order_by(Video.updated_at.desc()).first()
+
+def select_encoded_video(etag: str, profile: str, db: Session):
+    # 같은 ETag/프로파일로 인코딩이 끝난 영상
+    return db.query(Video).filter(
+        Video.s3_etag == etag,
+        Video.status == VideoStatus.READY,
+        Video.hls_path.isnot(None),
+        Video.encoding_json["profile"].astext == profile,
+        # 빠른 게시 후 보충 중인(일부 화질만 게시된) 영상 제외: register_encoded 와 같은 기준
+        func.coalesce(func.jsonb_array_length(Video.encoding_json["pending_rungs"]), 0) == 0
+    ).order_by(Video.updated_at.asc()).first()
+
+def select_known_uploads(original_paths: list[str], db: Session) -> set[tuple[str, str]]:
+    rows = db.query(Video.original_path, Video.s3_etag).filter(Video.original_path.in_(original_paths)).all()
+    return {(row.original_path, row.s3_etag) for row in rows}
+
+# 테이블별 ON CONFLICT 기준 (Video/Worker 는 유니크 제약)
+CONFLICT_KEYS = {
+    Video: ("original_path", "s3_etag"),
+    Worker: ("hostname",),
+    EncodingJob: ("id",),
+}
+
 def insert_or_update_video(dto : Video, db: Session = None):
-    if db:
-        _perform_insert_or_update(db, Video, {"original_path": dto.original_path, "s3_etag": dto.s3_etag}, dto)
-        return dto
-    with session_scope() as db_session:
-        _perform_insert_or_update(db_session, Video, {"original_path": dto.original_path, "s3_etag": dto.s3_etag}, dto)
-        return dto
+    return upsert(Video, dto, db)
 
 def insert_or_update_worker(dto : Worker, db: Session = None):
-    if db:
-        _perform_insert_or_update(db, Worker, {"hostname": dto.hostname}, dto)
-        return dto
-    with session_scope() as db_session:
-        _perform_insert_or_update(db_session, Worker, {"hostname": dto.hostname}, dto)
-        return dto
+    return upsert(Worker, dto, db)
+
+def register_worker(dto : Worker, db: Session) -> str:
+    # 저장된 워커 행의 id (워커 시작 시 1회)
+    return str(upsert(Worker, dto, db).id)
 
 def insert_or_update_job(dto : EncodingJob, db: Session = None):
+    return upsert(EncodingJob, dto, db)
+
+def insert_worker_metrics(rows: list[dict], db: Session):
+    if rows:
+        db.execute(insert(WorkerMetric), rows)
+
+def rollup_worker_metrics(hostname: str, source: str, resolution: str, unit: str, step: timedelta, db: Session):
+    """source 해상도 행을 unit(minute/hour) 단위로 묶어 resolution 행으로 집계 (완료된 구간만, 이미 집계한 구간 이후부터)"""
+    last = db.query(func.max(WorkerMetric.bucket)).filter_by(hostname=hostname, resolution=resolution).scalar()
+    bucket = func.date_trunc(unit, WorkerMetric.bucket)
+    weight = func.sum(WorkerMetric.samples)
+
+    query = select(
+        literal(hostname), literal(resolution), bucket,
+        func.sum(WorkerMetric.cpu * WorkerMetric.samples) / weight,
+        func.max(WorkerMetric.cpu_max),
+        func.sum(WorkerMetric.memory * WorkerMetric.samples) / weight,
+        func.max(WorkerMetric.memory_max),
+        func.max(WorkerMetric.rss_mb),
+        func.sum(WorkerMetric.read_mb_per_second * WorkerMetric.samples) / weight,
+        func.sum(WorkerMetric.write_mb_per_second * WorkerMetric.samples) / weight,
+        func.min(WorkerMetric.scratch_free_gb),
+        weight,
+    ).where(
+        WorkerMetric.hostname == hostname,
+        WorkerMetric.resolution == source,
+        WorkerMetric.bucket < func.date_trunc(unit, func.now()),
+    ).group_by(bucket)
+    if last is not None:
+        query = query.where(WorkerMetric.bucket >= last + step)
+
+    db.execute(insert(WorkerMetric).from_select([
+        "hostname", "resolution", "bucket", "cpu", "cpu_max", "memory", "memory_max", "rss_mb",
+        "read_mb_per_second", "write_mb_per_second", "scratch_free_gb", "samples",
+    ], query))
+
+def delete_worker_metrics_before(hostname: str, resolution: str, cutoff: datetime, db: Session):
+    db.execute(delete(WorkerMetric).where(
+        WorkerMetric.hostname == hostname,
+        WorkerMetric.resolution == resolution,
+        WorkerMetric.bucket < cutoff,
+    ))
+
+async def select_worker_metrics(hostname: str, resolution: str, since: datetime, db: "AsyncSession"):
+    result = await db.execute(select(WorkerMetric).where(
+        WorkerMetric.hostname == hostname,
+        WorkerMetric.resolution == resolution,
+        WorkerMetric.bucket >= since,
+    ).order_by(WorkerMetric.bucket.asc()))
+    return result.scalars().all()
+
+def upsert(model_class, dto, db: Session = None):
+    """INSERT ... ON CONFLICT DO UPDATE ... RETURNING 1회로 저장하고 반환된 값(id, 기본값 등) 을 dto 에 반영"""
     if db:
-        _perform_insert_or_update(db, EncodingJob, {"id": dto.id}, dto)
-        return dto
+        return _perform_upsert(db, model_class, dto)
     with session_scope() as db_session:
-        _perform_insert_or_update(db_session, EncodingJob, {"id": dto.id}, dto)
-        return dto
+        return _perform_upsert(db_session, model_class, dto)
 
-def _perform_insert_or_update(db: Session, model_class, filter_criteria, dto):
-    try:
-        entity = db.query(model_class).filter_by(**filter_criteria).first()
-    except Exception:
-        db.rollback()
-        entity = db.query(model_class).filter_by(**filter_criteria).first()
-    if entity:
-        update_entity(dto, entity)
-    else:
-        entity = db.merge(dto)
-    db.flush()
-    db.refresh(entity)
-    return entity
-
-def update_entity(dto : ENTITY_TYPE , entity):
-    for key, value in dto.__dict__.items():
-        if not key.startswith('_') and value is not None:
-            setattr(entity, key, value)
+def _upsert_values(model_class, dto) -> dict:
+    # None 이 아닌 값만 사용 (기존 update_entity 와 같이 None 은 덮어쓰지 않고, 신규 행은 컬럼 기본값 적용)
+    # DB 가 정하는 시각(server_default/onupdate) 은 조회해 온 dto 의 이전 값을 쓰지 않음
+    values = {}
+    for column in model_class.__table__.columns:
+        if column.server_default is not None or column.onupdate is not None:
+            continue
+        value = getattr(dto, column.key, None)
+        if value is not None:
+            values[column.key] = value
+    return values
+
+def _upsert_statement(model_class, values: dict):
+    """INSERT ... ON CONFLICT DO UPDATE ... RETURNING 문"""
+    table = model_class.__table__
+    conflict_keys = CONFLICT_KEYS[model_class]
+    stmt = pg_insert(table).values(values)
+    update_set = {
+        key: stmt.excluded[key] for key in values
+        if key not in conflict_keys and not table.columns[key].primary_key
+    }
+    # ON CONFLICT 경로에서는 onupdate 가 적용되지 않으므로 항상 직접 갱신
+    for column in table.columns:
+        if column.onupdate is not None:
+            update_set[column.key] = func.now()
+    return stmt.on_conflict_do_update(index_elements=list(conflict_keys), set_=update_set).returning(*table.columns)
+
+def _perform_upsert(db: Session, model_class, dto):
+    row = db.execute(_upsert_statement(model_class, _upsert_values(model_class, dto))).mappings().one()
+    for column_key, value in row.items():
+        set_committed_value(dto, column_key, value)
+
+    # 커밋 후 변경 알림 대상 (worker/events.py)
+    db.info.setdefault("upserted", []).append(dto)
+    return dto
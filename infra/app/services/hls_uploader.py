@@ -0,0 +1,107 @@
+import os, re, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+from app.core.config import Settings
+from app.services.s3_service import S3Service, TransferStats
+
+SEGMENT_PATTERN = re.compile(r"^(.*?)(\d+)\.ts$")
+
+class HlsStreamUploader:
+    """ffmpeg 가 세그먼트를 쓰는 동안 완성된 .ts 파일을 백그라운드 풀로 업로드합니다.
+
+    같은 폴더에 다음 번호의 세그먼트가 생기면 이전 세그먼트는 쓰기가 끝난 것으로 보고 업로드하며,
+    업로드가 끝난 로컬 세그먼트는 삭제해 스크래치 디스크 사용량을 제한합니다.
+    플레이리스트(.m3u8)는 건드리지 않으므로 검증 후 호출 측에서 마지막에 게시해야 합니다.
+    """
+
+    def __init__(self, s3_service: S3Service, local_folder: str, bucket: str, s3_prefix: str,
+                 max_workers: int = Settings.S3_TRANSFER_WORKERS, poll_interval: float = 0.5):
+        self.s3_service = s3_service
+        self.local_folder = local_folder
+        self.bucket = bucket
+        self.s3_prefix = s3_prefix
+        self.poll_interval = poll_interval
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hls-upload")
+        self._submitted = set()
+        self._futures = []
+        self._uploaded_keys = []
+        self._uploaded_bytes = 0
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._watch, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def finish(self) -> TransferStats:
+        """인코딩 종료 후 호출: 남은 세그먼트까지 모두 업로드하고 첫 번째 업로드 에러를 전파"""
+        self._stop_watching()
+        self._scan(final=True)
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._executor.shutdown(wait=True)
+
+        with self._lock:
+            stats = TransferStats("stream-upload", len(self._uploaded_keys), self._uploaded_bytes, time.monotonic() - self._started)
+        print(f"S3 {stats}", flush=True)
+        return stats
+
+    def discard(self):
+        """실패한 인코딩의 업로드를 중단하고 이미 올라간 세그먼트를 삭제"""
+        self._stop_watching()
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+
+        with self._lock:
+            keys = list(self._uploaded_keys)
+        if keys:
+            try:
+                self.s3_service.delete_keys(self.bucket, keys)
+            except Exception as e:
+                print(f"업로드 세그먼트 정리 실패: {e}", flush=True)
+
+    @property
+    def uploaded_count(self) -> int:
+        with self._lock:
+            return len(self._uploaded_keys)
+
+    def _stop_watching(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _watch(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self._scan(final=False)
+            except Exception as e:
+                print(f"세그먼트 감시 에러: {e}", flush=True)
+
+    def _scan(self, final: bool):
+        for root, _, files in os.walk(self.local_folder):
+            segments = sorted(
+                (int(match.group(2)), name) for name in files if (match := SEGMENT_PATTERN.match(name))
+            )
+            # 가장 마지막 세그먼트는 ffmpeg 가 아직 쓰고 있을 수 있음
+            ready = segments if final else segments[:-1]
+            for _, name in ready:
+                path = os.path.join(root, name)
+                if path in self._submitted:
+                    continue
+                self._submitted.add(path)
+                self._futures.append(self._executor.submit(self._upload, path))
+
+    def _upload(self, path: str):
+        relative_path = os.path.relpath(path, self.local_folder)
+        key = os.path.join(self.s3_prefix, relative_path).replace("\\", "/")
+        size = self.s3_service.upload_file(path, self.bucket, key)
+        with self._lock:
+            self._uploaded_keys.append(key)
+            self._uploaded_bytes += size
+        os.remove(path)
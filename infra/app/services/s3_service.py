@@ -1,8 +1,56 @@
-import boto3, os, mimetypes
+import boto3, os, mimetypes, time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 
 from app.core.config import Settings
-from fastapi import UploadFile
+
+MB = 1024 * 1024
+
+def _publish_phases(items: list, key, prefix: str) -> list[list]:
+    """HLS 게시 순서: 미디어(세그먼트/fMP4) -> 화질별 플레이리스트 -> 최상위 master.m3u8"""
+    master_key = f"{prefix.rstrip('/')}/master.m3u8"
+    phases = ([], [], [])
+    for item in items:
+        item_key = key(item)
+        if item_key == master_key:
+            phases[2].append(item)
+        elif item_key.endswith(".m3u8"):
+            phases[1].append(item)
+        else:
+            phases[0].append(item)
+    return [phase for phase in phases if phase]
+
+@dataclass
+class TransferStats:
+    direction: str
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / MB / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "direction": self.direction,
+            "files": self.files,
+            "bytes": self.bytes,
+            "seconds": round(self.seconds, 3),
+            "mb_per_second": round(self.mb_per_second, 2),
+        }
+
+    def __str__(self):
+        return (f"[{self.direction}] {self.files} files, {self.bytes / MB:.1f}MB "
+                f"in {self.seconds:.2f}s ({self.mb_per_second:.1f}MB/s)")
+
+def is_video_key(key: str) -> bool:
+    mime_type, _ = mimetypes.guess_type(key)
+    return bool(mime_type and mime_type.startswith('video/'))
 
 class S3Service:
     def __init__(self):
@@ -11,80 +59,148 @@ class S3Service:
             endpoint_url=Settings.S3_ENDPOINT,
             aws_access_key_id=Settings.AWS_ACCESS_KEY,
             aws_secret_access_key=Settings.AWS_SECRET_KEY,
-            region_name="us-east-1"
+            region_name="us-east-1",
+            # 업로드 스레드 풀 전체가 공유하는 커넥션 풀
+            config=Config(max_pool_connections=Settings.S3_MAX_POOL_CONNECTIONS)
+        )
+        # 기준 크기 이상은 멀티파트 업로드 / 병렬 Range GET 다운로드
+        self.transfer_config = TransferConfig(
+            multipart_threshold=Settings.S3_MULTIPART_THRESHOLD_MB * MB,
+            multipart_chunksize=Settings.S3_MULTIPART_CHUNKSIZE_MB * MB,
+            max_concurrency=Settings.S3_MAX_CONCURRENCY,
+            use_threads=True
         )
 
     def list_videos(self, bucket: str, prefix: str = ""):
-        response = self.s3.list_objects_v2(Bucket=bucket, Prefix=prefix)
+        video_files = []
+        start_after = ""
+        while start_after is not None:
+            page, start_after = self.list_videos_page(bucket, prefix, start_after)
+            video_files += page
+        return video_files
+
+    def list_videos_page(self, bucket: str, prefix: str = "", start_after: str = "", max_keys: int = 1000):
+        """StartAfter 기준 한 페이지 조회. 다음 페이지가 없으면 커서로 None 반환"""
+        params = {"Bucket": bucket, "Prefix": prefix, "MaxKeys": max_keys}
+        if start_after:
+            params["StartAfter"] = start_after
+        response = self.s3.list_objects_v2(**params)
         video_files = []
 
-        if 'Contents' in response:
-            for obj in response['Contents']:
-                key = obj['Key']
-                etag = obj['ETag'].replace('"', '')
+        contents = response.get('Contents', [])
+        for obj in contents:
+            key = obj['Key']
+            etag = obj['ETag'].replace('"', '')
 
-                mime_type, _ = mimetypes.guess_type(key)
-                if mime_type and mime_type.startswith('video/'):
-                    video_files.append({"Key":key,"ETag":etag})
+            if is_video_key(key):
+                video_files.append({"Key":key,"ETag":etag})
 
-        return video_files
+        next_start_after = contents[-1]['Key'] if response.get('IsTruncated') and contents else None
+        return video_files, next_start_after
 
-    def download_file(self, bucket: str, key: str, local_path: str):
-        self.s3.download_file(bucket, key, local_path)
+    def download_file(self, bucket: str, key: str, local_path: str) -> TransferStats:
+        started = time.monotonic()
+        self.s3.download_file(bucket, key, local_path, Config=self.transfer_config)
+        stats = TransferStats("download", 1, os.path.getsize(local_path), time.monotonic() - started)
+        print(f"S3 {stats}", flush=True)
+        return stats
 
-    def upload_hls_folder(self, local_folder: str, bucket: str, s3_prefix: str):
+    def upload_file(self, local_path: str, bucket: str, key: str) -> int:
+        size = os.path.getsize(local_path)
+        self.s3.upload_file(local_path, bucket, key, Config=self.transfer_config)
+        return size
+
+    def read_text(self, bucket: str, key: str) -> str | None:
+        try:
+            return self.s3.get_object(Bucket=bucket, Key=key)['Body'].read().decode('utf-8')
+        except self.s3.exceptions.NoSuchKey:
+            return None
+
+    def upload_hls_folder(self, local_folder: str, bucket: str, s3_prefix: str, extensions: tuple[str, ...] | None = None) -> TransferStats:
+        uploads = []
         for root, _, files in os.walk(local_folder):
             for file in files:
+                if extensions and not file.endswith(extensions):
+                    continue
                 local_file_path = os.path.join(root, file)
                 relative_path = os.path.relpath(local_file_path, local_folder)
                 s3_key = os.path.join(s3_prefix, relative_path).replace("\\", "/")
-                self.s3.upload_file(local_file_path, bucket, s3_key)
+                uploads.append((local_file_path, s3_key))
+
+        started = time.monotonic()
+        sizes = []
+        with ThreadPoolExecutor(max_workers=Settings.S3_TRANSFER_WORKERS, thread_name_prefix="s3-upload") as executor:
+            # 단계별로 끝난 뒤 다음 단계 시작: 플레이리스트가 아직 없는 세그먼트/화질을 가리키지 않도록 함
+            for phase in _publish_phases(uploads, key=lambda item: item[1], prefix=s3_prefix):
+                sizes += list(executor.map(lambda item: self.upload_file(item[0], bucket, item[1]), phase))
+
+        stats = TransferStats("upload", len(sizes), sum(sizes), time.monotonic() - started)
+        print(f"S3 {stats}", flush=True)
+        return stats
+
+    def copy_prefix(self, bucket: str, source_prefix: str, target_prefix: str) -> TransferStats:
+        # 서버 측 복사라 데이터가 워커를 거치지 않음
+        paginator = self.s3.get_paginator('list_objects_v2')
+        objects = [
+            obj for page in paginator.paginate(Bucket=bucket, Prefix=f"{source_prefix.rstrip('/')}/")
+            for obj in page.get('Contents', [])
+        ]
 
-    async def upload_api_file(self, file: UploadFile, bucket: str,  s3_path: str):
-        try:
-            self.s3.upload_fileobj(
-                file.file,
-                bucket,
-                s3_path,
-                ExtraArgs={"ContentType": file.content_type}
+        def copy(obj):
+            relative_path = obj['Key'][len(source_prefix.rstrip('/')) + 1:]
+            self.s3.copy_object(
+                Bucket=bucket,
+                Key=f"{target_prefix.rstrip('/')}/{relative_path}",
+                CopySource={'Bucket': bucket, 'Key': obj['Key']}
+            )
+            return obj['Size']
+
+        started = time.monotonic()
+        sizes = []
+        with ThreadPoolExecutor(max_workers=Settings.S3_TRANSFER_WORKERS, thread_name_prefix="s3-copy") as executor:
+            for phase in _publish_phases(objects, key=lambda obj: obj['Key'], prefix=source_prefix):
+                sizes += list(executor.map(copy, phase))
+
+        stats = TransferStats("copy", len(sizes), sum(sizes), time.monotonic() - started)
+        print(f"S3 {stats}", flush=True)
+        return stats
+
+    def delete_keys(self, bucket: str, keys: list[str]):
+        # delete_objects 는 요청당 최대 1000개
+        for i in range(0, len(keys), 1000):
+            self.s3.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in keys[i:i + 1000]], "Quiet": True}
             )
-        except Exception as e:
-            return str(e)
-
-    def update_master_file(self, bucket: str, s3_prefix: str ='encode/'):
-        bucket_list = self.s3.list_objects_v2(Bucket=bucket, Prefix=s3_prefix, Delimiter='/')
-
-        prefixes = [content.get('Prefix') for content in bucket_list.get('CommonPrefixes', [])]
-
-        if not prefixes:
-            print("하위 폴더를 찾을 수 없습니다.")
-            return
 
-        master_lines = [
-            "#EXTM3U",
-            "#EXT-X-VERSION:3",
-            ""
+    def delete_prefix(self, bucket: str, prefix: str, modified_since: datetime | None = None) -> int:
+        """prefix 아래 객체 삭제 (modified_since 가 있으면 그 이후에 쓰인 객체만)"""
+        paginator = self.s3.get_paginator('list_objects_v2')
+        keys = [
+            obj['Key'] for page in paginator.paginate(Bucket=bucket, Prefix=f"{prefix.rstrip('/')}/")
+            for obj in page.get('Contents', [])
+            if modified_since is None or obj['LastModified'] >= modified_since
         ]
-        for i, p in enumerate(sorted(prefixes)):
-            folder_name = p.split('/')[-2]
-
-            bandwidth = 2000000 + i
-            master_lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={bandwidth},NAME="{folder_name}"')
-            master_lines.append(f'{folder_name}/master.m3u8')
-            master_lines.append("")
-
-        master_content = "\n".join(master_lines)
-
-        master_key = f"{s3_prefix}master.m3u8"
+        self.delete_keys(bucket, keys)
+        return len(keys)
 
+    def put_text(self, bucket: str, key: str, body: str, content_type: str):
+        # 단일 PUT 이라 읽는 쪽은 이전 내용 또는 새 내용 중 하나만 봄
         self.s3.put_object(
             Bucket=bucket,
-            Key=master_key,
-            Body=master_content,
-            ContentType='application/x-mpegURL',
+            Key=key,
+            Body=body.encode('utf-8'),
+            ContentType=content_type,
             CacheControl='no-cache, no-store, must-revalidate'
         )
 
+    def list_prefixes(self, bucket: str, prefix: str):
+        """prefix 바로 아래 폴더 이름 목록 (페이지네이션)"""
+        paginator = self.s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter='/'):
+            for content in page.get('CommonPrefixes', []):
+                yield content['Prefix'][len(prefix):].rstrip('/')
+
     def set_cors_policy_for_uploads(self, bucket_name: str):
         cors_configuration = {
             'CORSRules': [
@@ -118,4 +234,15 @@ class S3Service:
             return url
         except ClientError as e:
             print(f"Error creating presigned URL: {e}", flush=True)
-        return None
\ No newline at end of file
+        return None
+
+    def create_presigned_url_for_get(self, bucket_name: str, object_key: str, expiration: int = 3600) -> str | None:
+        try:
+            return self.s3.generate_presigned_url(
+                'get_object',
+                Params={'Bucket': bucket_name, 'Key': object_key},
+                ExpiresIn=expiration
+            )
+        except ClientError as e:
+            print(f"Error creating presigned URL: {e}", flush=True)
+        return None
@@ -0,0 +1,53 @@
+import json, boto3
+from urllib.parse import unquote_plus
+
+from app.core.config import Settings
+
+class SqsService:
+    def __init__(self):
+        self.sqs = boto3.client(
+            'sqs',
+            endpoint_url=Settings.S3_ENDPOINT,
+            aws_access_key_id=Settings.AWS_ACCESS_KEY,
+            aws_secret_access_key=Settings.AWS_SECRET_KEY,
+            region_name="us-east-1"
+        )
+        self._queue_urls = {}
+
+    def get_queue_url(self, queue_name: str) -> str:
+        if queue_name not in self._queue_urls:
+            self._queue_urls[queue_name] = self.sqs.get_queue_url(QueueName=queue_name)["QueueUrl"]
+        return self._queue_urls[queue_name]
+
+    def receive_s3_events(self, queue_name: str, wait_seconds: int = 20):
+        """S3 버킷 알림 메시지를 롱 폴링으로 수신해 (receipt_handle, [{"Key", "ETag"}]) 목록으로 반환"""
+        response = self.sqs.receive_message(
+            QueueUrl=self.get_queue_url(queue_name),
+            MaxNumberOfMessages=10,
+            WaitTimeSeconds=wait_seconds
+        )
+        messages = []
+        for message in response.get("Messages", []):
+            body = json.loads(message["Body"])
+            # SNS 를 거친 알림은 Message 필드 안에 원본 이벤트가 들어있음
+            if "Message" in body and "Records" not in body:
+                body = json.loads(body["Message"])
+
+            objects = []
+            for record in body.get("Records", []):
+                if not record.get("eventName", "").startswith("ObjectCreated"):
+                    continue
+                s3_object = record["s3"]["object"]
+                objects.append({
+                    "Key": unquote_plus(s3_object["key"]),
+                    "ETag": s3_object.get("eTag", "").replace('"', '')
+                })
+            messages.append((message["ReceiptHandle"], objects))
+        return messages
+
+    def delete_messages(self, queue_name: str, receipt_handles: list[str]):
+        for i in range(0, len(receipt_handles), 10):
+            self.sqs.delete_message_batch(
+                QueueUrl=self.get_queue_url(queue_name),
+                Entries=[{"Id": str(idx), "ReceiptHandle": handle} for idx, handle in enumerate(receipt_handles[i:i + 10])]
+            )
@@ -0,0 +1,89 @@
+import threading, time
+from typing import Callable
+from redis.exceptions import ResponseError
+
+from app.core.config import Settings
+from app.worker.redis_app import watch_state
+from app.services.s3_service import S3Service, is_video_key
+from app.services.sqs_service import SqsService
+from app.watcher.upload_state import prune_seen
+
+INGEST_GROUP = "watcher"
+CURSOR_KEY = "ingest:cursor"
+STREAM_MAXLEN = 100000
+# 처리되지 못하고 이 시간 이상 대기 중인 이벤트는 다시 가져와 재처리
+RECLAIM_IDLE_MS = 30000
+
+s3_service = S3Service()
+sqs_service = SqsService()
+
+def _ensure_group():
+    try:
+        watch_state.xgroup_create(Settings.INGEST_STREAM, INGEST_GROUP, id="0", mkstream=True)
+    except ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+def forward_s3_events():
+    """S3 버킷 알림(SQS) 을 Redis Stream 으로 전달"""
+    while True:
+        try:
+            messages = sqs_service.receive_s3_events(Settings.UPLOAD_EVENT_QUEUE)
+            for _, objects in messages:
+                for obj in objects:
+                    if is_video_key(obj["Key"]):
+                        watch_state.xadd(Settings.INGEST_STREAM, obj, maxlen=STREAM_MAXLEN, approximate=True)
+            if messages:
+                sqs_service.delete_messages(Settings.UPLOAD_EVENT_QUEUE, [receipt for receipt, _ in messages])
+        except Exception as e:
+            print(f"S3 이벤트 수신 에러: {e}", flush=True)
+            time.sleep(5)
+
+def _handle_entries(entries, handler: Callable[[list[dict]], list[dict]]):
+    if not entries:
+        return
+    pending = {(obj["Key"], obj["ETag"]) for obj in handler([fields for _, fields in entries])}
+    # 가용 워커가 없어 처리하지 못한 이벤트는 ACK 하지 않고 대기 목록에 남김
+    done = [message_id for message_id, fields in entries if (fields["Key"], fields["ETag"]) not in pending]
+    if done:
+        watch_state.xack(Settings.INGEST_STREAM, INGEST_GROUP, *done)
+
+def consume_events(handler: Callable[[list[dict]], list[dict]], consumer: str):
+    # 중단된 컨슈머나 이전 처리 실패로 남은 이벤트 회수
+    claimed = watch_state.xautoclaim(
+        Settings.INGEST_STREAM, INGEST_GROUP, consumer, min_idle_time=RECLAIM_IDLE_MS, start_id="0-0", count=32
+    )
+    _handle_entries(claimed[1], handler)
+
+    streams = watch_state.xreadgroup(INGEST_GROUP, consumer, {Settings.INGEST_STREAM: ">"}, count=32, block=5000)
+    for _, entries in streams or []:
+        _handle_entries(entries, handler)
+
+def reconcile_page(handler: Callable[[list[dict]], list[dict]]) -> bool:
+    """이벤트 누락 대비 점검: 저장된 StartAfter 커서부터 한 페이지씩 목록 확인. 다음 페이지가 있으면 True"""
+    cursor = watch_state.get(CURSOR_KEY) or ""
+    videos, next_cursor = s3_service.list_videos_page(
+        Settings.UPLOAD_BUCKET_NAME, start_after=cursor, max_keys=Settings.RECONCILE_PAGE_SIZE
+    )
+    handler(videos)
+
+    watch_state.set(CURSOR_KEY, next_cursor or "")
+    return next_cursor is not None
+
+def run_event_ingest(handler: Callable[[list[dict]], list[dict]]):
+    _ensure_group()
+    threading.Thread(target=forward_s3_events, daemon=True).start()
+
+    next_reconcile = 0.0
+    while True:
+        try:
+            if time.monotonic() >= next_reconcile:
+                has_more = reconcile_page(handler)
+                # 한 바퀴 점검이 끝나면 보존 기간이 지난 처리 상태를 정리하고 다음 점검까지 대기
+                if not has_more:
+                    prune_seen()
+                next_reconcile = time.monotonic() + (0 if has_more else Settings.RECONCILE_INTERVAL)
+            consume_events(handler, Settings.WATCHER_NAME)
+        except Exception as e:
+            print(f"에러 발생: {e}", flush=True)
+            time.sleep(5)
@@ -0,0 +1,130 @@
+import time
+import redis
+from collections import defaultdict
+
+from app.core.config import Settings
+from app.worker.redis_app import watch_state
+from app.services.db_service import session_scope, select_known_uploads
+
+# 처리한 업로드 상태: 경로(prefix) 별 해시 {key: etag} + 적재 시각 정렬 집합(보존 기간 관리)
+# 관리용 키는 객체 경로와 겹치지 않도록 별도 이름공간(s3_files_meta:) 사용
+META_PREFIX = f"{Settings.REDIS_PREFIX.rstrip(':')}_meta:"
+PREFIX_SET_KEY = f"{META_PREFIX}prefixes"
+# 이전 방식: 객체마다 만료 없는 문자열 키 s3_file:<key> = etag
+LEGACY_KEY_PREFIX = "s3_file:"
+PRUNE_BATCH = 1000
+
+def _prefix(key: str) -> str:
+    return key.rsplit('/', 1)[0] if '/' in key else ""
+
+def _hash_key(prefix: str) -> str:
+    return f"{Settings.REDIS_PREFIX}{prefix}"
+
+def _seen_key(prefix: str) -> str:
+    return f"{META_PREFIX}seen:{prefix}"
+
+def migrate_legacy_state():
+    """객체별 문자열 키(s3_file:<key>) 를 prefix 별 해시로 옮기고 삭제 (남은 키가 없으면 아무 것도 하지 않음)
+
+    옮긴 항목은 이동 시각으로 적재되어 이후 보존 기간이 지나면 prune_seen 이 정리합니다.
+    """
+    moved = 0
+    batch = []
+    for key in watch_state.scan_iter(match=f"{LEGACY_KEY_PREFIX}*", count=PRUNE_BATCH):
+        batch.append(key)
+        if len(batch) >= PRUNE_BATCH:
+            moved += _migrate_legacy_keys(batch)
+            batch = []
+    if batch:
+        moved += _migrate_legacy_keys(batch)
+    if moved:
+        print(f"업로드 상태 이전 키 {moved}개 이동 완료", flush=True)
+
+def _migrate_legacy_keys(keys: list[str]) -> int:
+    etags = watch_state.mget(keys)
+    objects = [
+        {"Key": key[len(LEGACY_KEY_PREFIX):], "ETag": etag}
+        for key, etag in zip(keys, etags) if etag is not None
+    ]
+    if objects:
+        mark_seen(objects)
+    watch_state.delete(*keys)
+    return len(objects)
+
+def mark_seen(objects: list[dict]):
+    now = time.time()
+    # prune_seen 의 빈 prefix 제거와 섞이지 않도록 한 트랜잭션으로 기록
+    pipe = watch_state.pipeline(transaction=True)
+    for obj in objects:
+        prefix = _prefix(obj["Key"])
+        pipe.sadd(PREFIX_SET_KEY, prefix)
+        pipe.hset(_hash_key(prefix), obj["Key"], obj["ETag"])
+        pipe.zadd(_seen_key(prefix), {obj["Key"]: now})
+    pipe.execute()
+
+def filter_unseen(objects: list[dict]) -> list[dict]:
+    """목록 페이지 단위로 처리 여부 확인 (prefix 당 HMGET 1회를 한 번의 파이프라인으로 전송)
+
+    Redis 에서 보존 기간이 지나 빠진 항목은 DB 에서 한 번 더 확인해 다시 적재합니다.
+    """
+    if not objects:
+        return []
+
+    groups = defaultdict(list)
+    for obj in objects:
+        groups[_prefix(obj["Key"])].append(obj)
+
+    pipe = watch_state.pipeline(transaction=False)
+    for prefix, group in groups.items():
+        pipe.hmget(_hash_key(prefix), [obj["Key"] for obj in group])
+    results = pipe.execute()
+
+    unseen = [
+        obj
+        for group, saved_etags in zip(groups.values(), results)
+        for obj, saved_etag in zip(group, saved_etags)
+        if saved_etag != obj["ETag"]
+    ]
+    if not unseen:
+        return []
+
+    with session_scope() as db:
+        known = select_known_uploads([obj["Key"] for obj in unseen], db=db)
+    rewarm = [obj for obj in unseen if (obj["Key"], obj["ETag"]) in known]
+    if rewarm:
+        mark_seen(rewarm)
+
+    return [obj for obj in unseen if (obj["Key"], obj["ETag"]) not in known]
+
+def prune_seen(retention_days: int = Settings.UPLOAD_STATE_RETENTION_DAYS):
+    """적재 후 보존 기간이 지난 항목 삭제로 Redis 메모리 사용량 제한
+
+    점수는 mark_seen 시각이며 목록 조회에서 다시 확인돼도 갱신하지 않습니다 (매 주기 쓰기 방지).
+    아직 버킷에 남아 있는 항목은 filter_unseen 이 DB 로 확인해 다시 적재하고, 비어 버린 prefix 는 목록에서 제거합니다.
+    """
+    cutoff = time.time() - retention_days * 24 * 3600
+    for prefix in watch_state.smembers(PREFIX_SET_KEY):
+        while True:
+            expired = watch_state.zrangebyscore(_seen_key(prefix), "-inf", cutoff, start=0, num=PRUNE_BATCH)
+            if not expired:
+                break
+            pipe = watch_state.pipeline(transaction=False)
+            pipe.hdel(_hash_key(prefix), *expired)
+            pipe.zrem(_seen_key(prefix), *expired)
+            pipe.execute()
+        _drop_if_empty(prefix)
+
+def _drop_if_empty(prefix: str):
+    # 확인과 제거 사이에 mark_seen 이 끼어들면 WatchError 로 제거하지 않음
+    with watch_state.pipeline() as pipe:
+        try:
+            pipe.watch(_hash_key(prefix), _seen_key(prefix))
+            if pipe.hlen(_hash_key(prefix)) or pipe.zcard(_seen_key(prefix)):
+                pipe.unwatch()
+                return
+            pipe.multi()
+            pipe.srem(PREFIX_SET_KEY, prefix)
+            pipe.delete(_hash_key(prefix), _seen_key(prefix))
+            pipe.execute()
+        except redis.WatchError:
+            pass
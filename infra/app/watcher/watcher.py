@@ -1,83 +1,131 @@
 import time, os
 from app.core import Worker, Video, EncodingJob
 from app.core.config import Settings
-from app.worker.redis_app import watch_state
-from app.worker.tasks import process_encode
+from app.worker.tasks import process_encode, copy_encoded_hls, get_cached_media_info, profile_key
+from app.worker.dedupe import find_encoded
+from app.worker.scheduling import pick_worker, record_dispatch
 from app.services.s3_service import S3Service
+from app.watcher.ingest import run_event_ingest
+from app.watcher.upload_state import filter_unseen, mark_seen, prune_seen, migrate_legacy_state
 from app.services.db_service import insert_or_update_video, insert_or_update_worker, insert_or_update_job
-from app.core.enum import VideoStatus
+from app.core.enum import VideoStatus, JobStatus
 
 s3_service = S3Service()
 
+PRUNE_INTERVAL = 3600
+
 def get_best_worker():
-    keys = watch_state.keys("status:worker_*")
-    best_worker = None
-    min_score = 101
-    for key in keys:
-        com_info = watch_state.hgetall(key)
-        cpu = float(com_info["cpu"])
-        memory = float(com_info["memory"])
-        score = (cpu + memory) / 2
-        print(com_info,flush=True)
-        if score < min_score:
-            min_score = score
-            best_worker = {
-                "hostname": key.split(':')[-1],
-                "id": com_info["id"],
-                "status": com_info["status"]
-            }
-
-
-    return best_worker
+    return pick_worker()
+
+def dedupe_upload(key: str, etag: str) -> bool:
+    """같은 내용이 이미 인코딩되어 있으면 인코딩 없이 결과를 재사용"""
+    if Settings.DEDUPE_MODE not in ("pointer", "copy"):
+        return False
+
+    # 같은 내용이 인코딩된 적이 있으면 분석 결과도 남아 있음 (없으면 재사용할 결과도 없음)
+    media_info = get_cached_media_info(Video(s3_etag = etag))
+    if media_info is None:
+        return False
+
+    profile = profile_key(media_info)
+    encoded = find_encoded(etag, profile)
+    if not encoded:
+        return False
+
+    new_video = Video(
+        s3_etag = etag,
+        filename = os.path.basename(key),
+        original_path = key,
+        encoding_json = {"profile": profile, "dedupe_of": encoded["video_id"]}
+    )
+
+    if Settings.DEDUPE_MODE == "pointer":
+        # 카탈로그에서 기존 HLS 경로를 그대로 가리킴
+        new_video.status = VideoStatus.READY
+        new_video.hls_path = encoded["hls_path"]
+        video_object = insert_or_update_video(new_video)
+        insert_or_update_job(EncodingJob(video_id = video_object.id, status = JobStatus.SUCCESS, progress = 100))
+    else:
+        new_video.status = VideoStatus.ENCODING
+        video_object = insert_or_update_video(new_video)
+        job_object = insert_or_update_job(EncodingJob(video_id = video_object.id, status = JobStatus.ENCODING))
+        copy_encoded_hls.apply_async(args=[str(video_object.id), str(job_object.id), encoded["hls_path"], encoded["video_id"]])
+
+    print(f"중복 업로드 재사용({Settings.DEDUPE_MODE}): {key} -> {encoded['hls_path']}", flush=True)
+    return True
+
+def allocate_object(key: str, etag: str) -> bool:
+    """새 업로드 1건 처리. 처리 완료(중복 포함) 시 True, 가용 워커가 없으면 False"""
+    if dedupe_upload(key, etag):
+        mark_seen([{"Key": key, "ETag": etag}])
+        return True
+
+    print(f"작업 추가: {key} (ETag: {etag})", flush=True)
+    retry_count = 3
+    while retry_count > 0:
+        best_worker = get_best_worker()
+        new_video = Video(
+            s3_etag = etag,
+            filename = os.path.basename(key),
+            original_path = key,
+            status = VideoStatus.ENCODING
+        )
+        if best_worker and best_worker['status'] != 'overload' :
+            print(f"사용 워커: {best_worker['hostname']} 상태: {best_worker['status']}", flush=True)
+
+            # 관리 DB 적재
+            video_object = insert_or_update_video(new_video)
+
+            job_object = insert_or_update_job(EncodingJob(
+                video_id = video_object.id,
+                worker_id = best_worker["id"]
+            ))
+
+            # JOB 할당
+            process_encode.apply_async(args=[str(video_object.id), str(job_object.id)], queue=best_worker["hostname"])
+            record_dispatch(best_worker["hostname"])
+
+            # 중복 방지용 저장
+            mark_seen([{"Key": key, "ETag": etag}])
+
+            return True
+        else:
+            retry_count -= 1
+            print(f"모든 워커의 자원이 부족합니다. 3초 후 재시도 합니다. 남은 횟수 ${retry_count}", flush=True)
+            time.sleep(3)
+    return False
+
+def allocate_objects(objects: list[dict]) -> list[dict]:
+    """목록 단위 처리: 이미 처리한 업로드는 한 번에 걸러내고, 가용 워커가 없어 남은 객체 목록을 반환"""
+    pending = []
+    for obj in filter_unseen(objects):
+        if not allocate_object(obj['Key'], obj['ETag']):
+            pending.append(obj)
+    return pending
 
 def allocate_task():
-    for obj in s3_service.list_videos(Settings.UPLOAD_BUCKET_NAME):
-        key = obj['Key']
-        etag = obj['ETag']
-
-        saved_etag = watch_state.get(f"{Settings.REDIS_PREFIX}{key}")
-
-        if saved_etag is None or saved_etag != etag:
-            print(f"작업 추가: {key} (ETag: {etag})", flush=True)
-            retry_count = 3
-            while retry_count > 0:
-                best_worker = get_best_worker()
-                new_video = Video(
-                    s3_etag = etag,
-                    filename = os.path.basename(key),
-                    original_path = key,
-                    status = VideoStatus.ENCODING
-                )
-                print(f"{best_worker}....{best_worker['status']}", flush=True)
-                if best_worker and best_worker['status'] != 'overload' :
-                    print(f"사용 워커: {best_worker['hostname']} 상태: {best_worker['status']}", flush=True)
-
-                    # 관리 DB 적재
-                    video_object = insert_or_update_video(new_video)
-
-                    job_object = insert_or_update_job(EncodingJob(
-                        video_id = video_object.id,
-                        worker_id = best_worker["id"]
-                    ))
-
-                    # JOB 할당
-                    process_encode.apply_async(args=[str(video_object.id), str(job_object.id)], queue=best_worker["hostname"])
-
-                    # 중복 방지용 저장
-                    watch_state.set(f"{Settings.REDIS_PREFIX}{key}",etag)
-
-                    break
-                else:
-                    retry_count -= 1
-                    print(f"모든 워커의 자원이 부족합니다. 3초 후 재시도 합니다. 남은 횟수 ${retry_count}", flush=True)
-                    time.sleep(3)
+    start_after = ""
+    while start_after is not None:
+        page, start_after = s3_service.list_videos_page(Settings.UPLOAD_BUCKET_NAME, start_after=start_after)
+        allocate_objects(page)
 
 def watch_s3():
     print(f"S3 감시 시작 ({Settings.UPLOAD_BUCKET_NAME})...", flush=True)
+    migrate_legacy_state()
+
+    if Settings.INGEST_MODE == "events":
+        # S3 이벤트 기반 수집 + 저빈도 전체 점검
+        run_event_ingest(allocate_objects)
+        return
+
     # 폴링 시작
+    next_prune = 0.0
     while True:
         try:
             allocate_task()
+            if time.monotonic() >= next_prune:
+                prune_seen()
+                next_prune = time.monotonic() + PRUNE_INTERVAL
             time.sleep(2) # 2초마다 확인
         except Exception as e:
             print(f"에러 발생: {e}", flush=True)
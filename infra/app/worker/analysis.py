@@ -0,0 +1,46 @@
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median
+
+from app.core.config import Settings
+
+SAMPLE_SECONDS = 2
+SAMPLE_HEIGHT = 360
+SAMPLE_CRF = 23
+# 일반적인 콘텐츠를 360p CRF 23 으로 인코딩했을 때의 기준 비트레이트
+REFERENCE_KBPS = 600
+
+def _sample_kbps(source: str, start: float, input_options: list[str]) -> float:
+    # 짧은 변을 360 으로 줄여 CRF 인코딩 후 결과 크기로 구간 복잡도 측정
+    scale = f"scale='if(gt(iw,ih),-2,{SAMPLE_HEIGHT})':'if(gt(iw,ih),{SAMPLE_HEIGHT},-2)'"
+    command = [
+        "ffmpeg", "-v", "error", "-ss", str(start), *input_options, "-i", source, "-t", str(SAMPLE_SECONDS),
+        "-an", "-vf", scale, "-c:v", "libx264", "-preset", "ultrafast", "-crf", str(SAMPLE_CRF),
+        "-f", "h264", "pipe:1"
+    ]
+    result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True)
+    return len(result.stdout) * 8 / 1000 / SAMPLE_SECONDS
+
+def analyze_complexity(source: str, total_duration: float, input_options: list[str] | None = None) -> dict:
+    """구간 샘플을 저해상도 CRF 로 인코딩해 콘텐츠 복잡도(비트레이트 배율) 추정
+
+    정지 화면 위주는 1 보다 작고, 움직임이 많은 영상은 1 보다 큰 배율이 나옵니다.
+    """
+    sample_count = max(1, Settings.COMPLEXITY_SAMPLES)
+    usable = max(0.0, total_duration - SAMPLE_SECONDS)
+    starts = [round(usable * (i + 1) / (sample_count + 1), 3) for i in range(sample_count)]
+
+    with ThreadPoolExecutor(max_workers=sample_count) as executor:
+        samples = list(executor.map(lambda start: _sample_kbps(source, start, input_options or []), starts))
+
+    measured = median(samples)
+    factor = min(Settings.COMPLEXITY_MAX_FACTOR, max(Settings.COMPLEXITY_MIN_FACTOR, measured / REFERENCE_KBPS))
+
+    return {
+        "factor": round(factor, 3),
+        "measured_kbps": round(measured, 1),
+        "reference_kbps": REFERENCE_KBPS,
+        "crf": SAMPLE_CRF,
+        "sample_starts": starts,
+        "sample_kbps": [round(kbps, 1) for kbps in samples],
+    }
@@ -0,0 +1,91 @@
+import json, time
+
+from app.core import Video, Settings
+from app.worker.redis_app import watch_state
+from app.services.s3_service import S3Service
+
+# 제목 등록 순서(점수) 정렬 집합과 제목별 정보, 마지막 번호
+CATALOG_TITLES_KEY = "catalog:titles"
+CATALOG_META_KEY = "catalog:meta"
+CATALOG_SEQ_KEY = "catalog:seq"
+CATALOG_LOCK_KEY = "catalog:lock"
+HLS_ROOT_PREFIX = "encode/"
+DEFAULT_BANDWIDTH = 2000000
+
+s3_service = S3Service()
+
+def _page_key(page: int, extension: str) -> str:
+    return f"{Settings.CATALOG_PREFIX}page-{page:05d}.{extension}"
+
+def _bandwidth(s3_upload_video : Video | None) -> int:
+    ladder = ((s3_upload_video.encoding_json or {}) if s3_upload_video else {}).get("ladder") or []
+    if not ladder:
+        return DEFAULT_BANDWIDTH
+    top = ladder[-1]
+    return (int(top["v_bit"].rstrip("k")) + int(top["a_bit"].rstrip("k"))) * 1000
+
+def _render_page(entries: list[dict]) -> tuple[str, str]:
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", ""]
+    for entry in entries:
+        lines.append(f'#EXT-X-STREAM-INF:BANDWIDTH={entry["bandwidth"]},NAME="{entry["name"]}"')
+        lines.append(f'../{entry["path"]}')
+        lines.append("")
+    return "\n".join(lines), json.dumps({"titles": entries}, ensure_ascii=False)
+
+def _publish_page(page: int):
+    """한 페이지(CATALOG_PAGE_SIZE 개) 만 다시 만들고 index 교체: 전체 목록 크기와 관계없이 일정한 비용"""
+    page_size = Settings.CATALOG_PAGE_SIZE
+    start = page * page_size + 1
+    names = watch_state.zrangebyscore(CATALOG_TITLES_KEY, start, start + page_size - 1)
+    entries = [json.loads(meta) for meta in watch_state.hmget(CATALOG_META_KEY, names) if meta] if names else []
+
+    playlist, page_json = _render_page(entries)
+    # 페이지를 먼저 올리고 index 를 마지막에 교체해 index 가 없는 페이지를 가리키지 않도록 함
+    s3_service.put_text(Settings.HLS_BUCKET_NAME, _page_key(page, "m3u8"), playlist, 'application/x-mpegURL')
+    s3_service.put_text(Settings.HLS_BUCKET_NAME, _page_key(page, "json"), page_json, 'application/json')
+
+    total = int(watch_state.get(CATALOG_SEQ_KEY) or 0)
+    index = {
+        "total": total,
+        "page_size": page_size,
+        "pages": (total + page_size - 1) // page_size,
+        "page_format": f"{Settings.CATALOG_PREFIX}page-{{page:05d}}.{{ext}}",
+        "updated_at": time.time(),
+    }
+    s3_service.put_text(Settings.HLS_BUCKET_NAME, f"{Settings.CATALOG_PREFIX}index.json", json.dumps(index), 'application/json')
+
+def _register(name: str, s3_upload_video : Video | None) -> int:
+    """제목을 카탈로그에 추가(이미 있으면 정보만 갱신) 하고 속한 페이지 번호 반환"""
+    seq = watch_state.zscore(CATALOG_TITLES_KEY, name)
+    if seq is None:
+        seq = watch_state.incr(CATALOG_SEQ_KEY)
+        watch_state.zadd(CATALOG_TITLES_KEY, {name: seq})
+
+    meta = {
+        "name": name,
+        "path": f"{HLS_ROOT_PREFIX}{name}/master.m3u8",
+        "bandwidth": _bandwidth(s3_upload_video),
+        "video_id": str(s3_upload_video.id) if s3_upload_video else None,
+        "updated_at": time.time(),
+    }
+    watch_state.hset(CATALOG_META_KEY, name, json.dumps(meta, ensure_ascii=False))
+    return (int(seq) - 1) // Settings.CATALOG_PAGE_SIZE
+
+def add_to_catalog(s3_upload_video : Video):
+    """게시된 영상 1건을 카탈로그에 반영 (해당 페이지와 index 만 교체)"""
+    name = s3_upload_video.hls_path[len(HLS_ROOT_PREFIX):] if s3_upload_video.hls_path.startswith(HLS_ROOT_PREFIX) \
+        else s3_upload_video.hls_path
+    with watch_state.lock(CATALOG_LOCK_KEY, timeout=60, blocking_timeout=60):
+        _publish_page(_register(name, s3_upload_video))
+
+def rebuild_catalog():
+    """카탈로그가 비어 있을 때 1회: 기존 게시 폴더를 페이지 단위로 등록"""
+    with watch_state.lock(CATALOG_LOCK_KEY, timeout=600, blocking_timeout=600):
+        if watch_state.exists(CATALOG_SEQ_KEY):
+            return
+        pages = set()
+        for name in s3_service.list_prefixes(Settings.HLS_BUCKET_NAME, HLS_ROOT_PREFIX):
+            pages.add(_register(name, None))
+        for page in sorted(pages):
+            _publish_page(page)
+        print(f"카탈로그 초기화: {int(watch_state.get(CATALOG_SEQ_KEY) or 0)}개", flush=True)
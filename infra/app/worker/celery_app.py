@@ -11,4 +11,10 @@ celery_app = Celery(
 celery_app.conf.update(
     task_default_queue='celery',
     worker_prefetch_multiplier=1,
+    # 우선순위별 큐를 두어 빠른 게시 이후의 보충 인코딩이 신규 작업보다 뒤에 처리되도록 함
+    broker_transport_options={
+        "priority_steps": list(range(10)),
+        "sep": ":",
+        "queue_order_strategy": "priority",
+    },
 )
@@ -0,0 +1,33 @@
+import json
+
+from app.core import Video
+from app.worker.redis_app import watch_state
+from app.services.db_service import session_scope, select_encoded_video
+
+# (ETag, 인코딩 프로파일) -> 이미 게시된 HLS 결과
+HLS_INDEX_KEY = "hls_index"
+
+def _index_field(etag: str, profile: str) -> str:
+    return f"{etag}:{profile}"
+
+def find_encoded(etag: str, profile: str) -> dict | None:
+    """같은 내용/같은 프로파일로 이미 인코딩된 결과 조회 (Redis 인덱스 -> DB 순)"""
+    hit = watch_state.hget(HLS_INDEX_KEY, _index_field(etag, profile))
+    if hit:
+        return json.loads(hit)
+
+    with session_scope() as db:
+        video = select_encoded_video(etag, profile, db=db)
+        if video is None:
+            return None
+        entry = {"video_id": str(video.id), "hls_path": video.hls_path}
+
+    watch_state.hset(HLS_INDEX_KEY, _index_field(etag, profile), json.dumps(entry))
+    return entry
+
+def register_encoded(video: Video):
+    profile = (video.encoding_json or {}).get("profile")
+    if not profile or not video.hls_path:
+        return
+    entry = {"video_id": str(video.id), "hls_path": video.hls_path}
+    watch_state.hset(HLS_INDEX_KEY, _index_field(video.s3_etag, profile), json.dumps(entry))
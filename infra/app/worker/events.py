@@ -0,0 +1,82 @@
+import json, time
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core import Video, EncodingJob
+from app.worker.redis_app import watch_state
+
+# 대시보드 실시간 변경 알림 채널 (manager 의 /events 가 구독해 SSE 로 전달)
+EVENTS_CHANNEL = "events:dashboard"
+# 세션에 모아 두었다가 커밋 후 발행 (롤백된 변경은 발행하지 않음)
+PENDING_INFO_KEY = "dashboard_events"
+UPSERTED_INFO_KEY = "upserted"
+TRACKED_ENTITIES = {Video: "video", EncodingJob: "job"}
+TRACKED_FIELDS = ("status", "progress", "hls_path", "error_log", "worker_id")
+# 목록 화면에 쓰지 않는 큰 컬럼은 제외
+EXCLUDED_FIELDS = ("encoding_json",)
+
+def _json_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+def publish_event(kind: str, data: dict, pipe=None):
+    message = json.dumps({"type": kind, "at": time.time(), "data": {k: _json_value(v) for k, v in data.items()}})
+    (pipe or watch_state).publish(EVENTS_CHANNEL, message)
+
+def _entity_data(entity) -> dict:
+    # 이미 적재된 값만 사용 (발행 때문에 DB 를 다시 읽지 않음)
+    return {
+        key: value for key, value in inspect(entity).dict.items()
+        if not key.startswith("_") and key not in EXCLUDED_FIELDS
+    }
+
+def _status_changed(entity) -> bool:
+    attrs = inspect(entity).attrs
+    return any(attrs[field].history.has_changes() for field in TRACKED_FIELDS if field in attrs)
+
+def _collect_changes(session, flush_context):
+    # after_flush 시점에는 new/dirty 목록과 변경 이력이 아직 남아 있음
+    pending = session.info.setdefault(PENDING_INFO_KEY, {})
+    for entity in list(session.new) + list(session.dirty):
+        kind = TRACKED_ENTITIES.get(type(entity))
+        if kind and _status_changed(entity):
+            pending[(kind, id(entity))] = (kind, entity)
+
+def _publish_changes(session):
+    pending = session.info.pop(PENDING_INFO_KEY, {})
+    # db_service.upsert 로 저장된 행 (ON CONFLICT 경로는 flush 이력이 남지 않음)
+    for entity in session.info.pop(UPSERTED_INFO_KEY, []):
+        kind = TRACKED_ENTITIES.get(type(entity))
+        if kind:
+            pending[(kind, id(entity))] = (kind, entity)
+    if not pending:
+        return
+    try:
+        pipe = watch_state.pipeline(transaction=False)
+        for kind, entity in pending.values():
+            publish_event(kind, _entity_data(entity), pipe)
+        pipe.execute()
+    except Exception as e:
+        # 알림 실패가 저장된 변경에 영향을 주지 않도록 함
+        print(f"대시보드 이벤트 발행 에러: {e}", flush=True)
+
+def _discard_changes(session):
+    session.info.pop(PENDING_INFO_KEY, None)
+    session.info.pop(UPSERTED_INFO_KEY, None)
+
+def track_status_changes():
+    """영상/작업 상태 변경을 커밋 후 EVENTS_CHANNEL 로 발행하도록 세션 이벤트 등록"""
+    if event.contains(Session, "after_flush", _collect_changes):
+        return
+    event.listen(Session, "after_flush", _collect_changes)
+    event.listen(Session, "after_commit", _publish_changes)
+    event.listen(Session, "after_rollback", _discard_changes)
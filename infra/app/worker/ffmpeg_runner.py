@@ -0,0 +1,163 @@
+import subprocess, threading, time
+from collections import deque
+from dataclasses import dataclass
+
+from app.core.config import Settings
+
+STDERR_TAIL_LINES = 50
+# 종료 요청 후 강제 종료까지 대기
+KILL_GRACE_SECONDS = 10
+
+@dataclass
+class FfmpegProgress:
+    out_time_us: int = 0
+    frame: int = 0
+    fps: float = 0.0
+    speed: float = 0.0
+    bitrate_kbps: float = 0.0
+    total_size: int = 0
+    ended: bool = False
+    stalled: bool = False
+
+    @property
+    def out_seconds(self) -> float:
+        return self.out_time_us / 1_000_000
+
+    def to_dict(self) -> dict:
+        return {
+            "out_time_us": self.out_time_us,
+            "frame": self.frame,
+            "fps": self.fps,
+            "speed": self.speed,
+            "bitrate_kbps": self.bitrate_kbps,
+            "total_size": self.total_size,
+            "stalled": int(self.stalled),
+        }
+
+def _number(value: str | None, suffix: str = "") -> float | None:
+    # "N/A", 빈 값은 None (직전 값 유지)
+    if not value:
+        return None
+    value = value.strip()
+    if suffix and value.endswith(suffix):
+        value = value[:-len(suffix)]
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+class ProgressParser:
+    """`-progress pipe:1` 의 key=value 출력을 줄 단위로 받아 `progress=` 블록마다 스냅샷 반환"""
+
+    def __init__(self):
+        self.current = FfmpegProgress()
+        self._block: dict[str, str] = {}
+
+    def feed(self, line: str) -> FfmpegProgress | None:
+        key, sep, value = line.strip().partition("=")
+        if not sep:
+            return None
+        if key != "progress":
+            self._block[key] = value
+            return None
+
+        block, self._block = self._block, {}
+        current = self.current
+        # out_time_ms 는 이름과 달리 마이크로초 단위 (구버전 호환)
+        out_time = _number(block.get("out_time_us"))
+        if out_time is None:
+            out_time = _number(block.get("out_time_ms"))
+        if out_time is not None and out_time >= 0:
+            current.out_time_us = int(out_time)
+        frame = _number(block.get("frame"))
+        if frame is not None:
+            current.frame = int(frame)
+        fps = _number(block.get("fps"))
+        if fps is not None:
+            current.fps = fps
+        speed = _number(block.get("speed"), "x")
+        if speed is not None:
+            current.speed = speed
+        bitrate = _number(block.get("bitrate"), "kbits/s")
+        if bitrate is not None:
+            current.bitrate_kbps = bitrate
+        total_size = _number(block.get("total_size"))
+        if total_size is not None:
+            current.total_size = int(total_size)
+        current.ended = value == "end"
+        return FfmpegProgress(**vars(current))
+
+def run_ffmpeg(command: list[str], on_progress=None, stall_seconds: float | None = None, kill_seconds: float | None = None) -> FfmpegProgress:
+    """ffmpeg 실행: 진행 상황은 stdout(-progress) 으로 파싱, stderr 는 별도 스레드에서 마지막 줄만 보관
+
+    출력 시간이 stall_seconds 동안 늘지 않으면 스냅샷의 stalled 를 표시하고, kill_seconds 동안 늘지 않으면
+    ffmpeg 를 종료하고 TimeoutExpired 를 발생시킵니다. 진행 출력 자체가 멈춘 경우(입력 대기 등) 도
+    감시 스레드가 판단합니다.
+    """
+    stall_seconds = Settings.FFMPEG_STALL_SECONDS if stall_seconds is None else stall_seconds
+    kill_seconds = Settings.FFMPEG_KILL_SECONDS if kill_seconds is None else kill_seconds
+    command = [command[0], "-progress", "pipe:1", "-nostats", *command[1:]]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, encoding='utf-8')
+
+    stderr_tail = deque(maxlen=STDERR_TAIL_LINES)
+    def drain_stderr():
+        for line in process.stderr:
+            stderr_tail.append(line)
+    drain = threading.Thread(target=drain_stderr, daemon=True)
+    drain.start()
+
+    parser = ProgressParser()
+    lock = threading.Lock()
+    state = {"last_out_time": -1, "last_advance": time.monotonic(), "stalled": False, "killed": False}
+    finished = threading.Event()
+
+    def report(snapshot: FfmpegProgress):
+        # 읽기 루프와 감시 스레드가 함께 호출하므로 잠금 안에서 전달
+        state["stalled"] = snapshot.stalled
+        if on_progress:
+            on_progress(snapshot)
+
+    def watchdog():
+        interval = max(0.1, min(1.0, stall_seconds / 4))
+        while not finished.wait(interval):
+            with lock:
+                idle = time.monotonic() - state["last_advance"]
+                if kill_seconds > 0 and idle > kill_seconds:
+                    state["killed"] = True
+                    break
+                if idle > stall_seconds and not state["stalled"]:
+                    report(FfmpegProgress(**{**vars(parser.current), "stalled": True}))
+        else:
+            return
+
+        print(f"  [정체] {kill_seconds}초 동안 진행이 없어 ffmpeg 종료", flush=True)
+        process.terminate()
+        try:
+            process.wait(timeout=KILL_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    guard = threading.Thread(target=watchdog, daemon=True)
+    guard.start()
+
+    try:
+        for line in process.stdout:
+            with lock:
+                snapshot = parser.feed(line)
+                if snapshot is None:
+                    continue
+                now = time.monotonic()
+                if snapshot.out_time_us > state["last_out_time"]:
+                    state["last_out_time"] = snapshot.out_time_us
+                    state["last_advance"] = now
+                snapshot.stalled = not snapshot.ended and now - state["last_advance"] > stall_seconds
+                report(snapshot)
+
+        process.wait()
+    finally:
+        finished.set()
+    drain.join()
+    if state["killed"]:
+        raise subprocess.TimeoutExpired(command, kill_seconds, stderr="".join(stderr_tail))
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command, stderr="".join(stderr_tail))
+    return parser.current
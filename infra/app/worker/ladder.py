@@ -0,0 +1,113 @@
+import hashlib, json, math
+
+from app.core.config import Settings
+
+HLS_SEGMENT_SECONDS = 2
+# 오디오 그룹 모드의 EXT-X-MEDIA GROUP-ID
+AUDIO_GROUP_ID = "aud"
+# 게시 결과 형태(세그먼트 구성, 플레이리스트 구성, 사다리 규칙 등) 를 바꾸는 코드 변경 시 올려서 이전 결과 재사용을 막음
+PROFILE_VERSION = 2
+
+# 기본 화질 사다리 (가로 영상 기준). 원본보다 큰 단계는 build_ladder 에서 제외됨
+LADDER = [
+    {"w": 640,  "h": 360,  "v_bit": "800k",  "a_bit": "96k", "buf": "1600k"},
+    {"w": 1280, "h": 720,  "v_bit": "2800k", "a_bit": "128k", "buf": "5600k"},
+    {"w": 1920, "h": 1080, "v_bit": "5000k", "a_bit": "192k", "buf": "10000k"},
+    {"w": 2560, "h": 1440, "v_bit": "10000k", "a_bit": "192k", "buf": "20000k"},
+    {"w": 3840, "h": 2160, "v_bit": "20000k", "a_bit": "256k", "buf": "40000k"},
+    # {"w": 7680, "h": 4320, "v_bit": "50000k", "a_bit": "320k", "buf": "80000k"}
+]
+
+def _kbps(value: str) -> int:
+    return int(value.rstrip("k"))
+
+def _even(value: float) -> int:
+    # libx264 는 짝수 해상도만 허용
+    return max(2, int(round(value / 2)) * 2)
+
+def build_ladder(width: int, height: int, bit_rate: int = 0, complexity: float = 1.0) -> list[dict]:
+    """원본 해상도/비트레이트에 맞춘 화질 사다리 생성
+
+    - 원본보다 큰 단계는 만들지 않음 (원본이 가장 낮은 단계보다 작으면 원본 해상도 1단계)
+    - 세로 영상은 짧은 변 기준으로 단계를 고르고 가로/세로를 뒤집어 비율 유지
+    - complexity 배율로 비트레이트/maxrate/bufsize 조정 (정지 화면 위주는 낮게, 움직임이 많으면 높게)
+    - 비디오 비트레이트는 원본 비트레이트를 넘지 않음
+    """
+    portrait = height > width
+    short_side, long_side = min(width, height), max(width, height)
+    source_kbps = bit_rate // 1000 if bit_rate else 0
+
+    ladder = []
+    for index, conf in enumerate(LADDER):
+        if conf["h"] > short_side and ladder:
+            break
+
+        target_short = _even(min(conf["h"], short_side))
+        target_long = _even(target_short * long_side / short_side)
+        w, h = (target_short, target_long) if portrait else (target_long, target_short)
+
+        v_kbps = round(_kbps(conf["v_bit"]) * complexity)
+        if source_kbps:
+            v_kbps = min(v_kbps, source_kbps)
+        buf_kbps = math.ceil(v_kbps * _kbps(conf["buf"]) / _kbps(conf["v_bit"]))
+
+        ladder.append({
+            "index": index,
+            "w": w,
+            "h": h,
+            "v_bit": f"{v_kbps}k",
+            "a_bit": conf["a_bit"],
+            "buf": f"{buf_kbps}k",
+        })
+
+        if conf["h"] >= short_side:
+            break
+
+    return ladder
+
+def rung_name(rung: dict) -> str:
+    # 출력 디렉터리/var_stream_map 이름: 사다리 단계 번호라 나눠서 인코딩해도 경로가 같음
+    return str(rung["index"])
+
+def audio_rendition_name(index: int) -> str:
+    return f"audio_{index}"
+
+def audio_group_bitrates() -> list[str]:
+    # AUDIO_GROUP_BITRATES="64k,128k" -> 오디오 렌디션 2개
+    return [bitrate.strip() for bitrate in Settings.AUDIO_GROUP_BITRATES.split(",") if bitrate.strip()]
+
+def audio_group_bandwidth(bitrates: list[str]) -> int:
+    """오디오 그룹의 최대 비트레이트(bps): 그룹을 참조하는 화질의 BANDWIDTH 에 더할 값"""
+    return max((int(bitrate.rstrip("k")) * 1000 for bitrate in bitrates), default=0)
+
+def ladder_pixels(ladder: list[dict]) -> int:
+    return sum(rung["w"] * rung["h"] for rung in ladder)
+
+def split_ladder(ladder: list[dict], max_height: int) -> tuple[list[dict], list[dict]]:
+    """빠른 게시용 낮은 화질(짧은 변 max_height 이하) 과 나중에 채울 높은 화질로 분리 (낮은 화질이 없으면 첫 단계)"""
+    first = [rung for rung in ladder if min(rung["w"], rung["h"]) <= max_height] or ladder[:1]
+    rest = [rung for rung in ladder if rung not in first]
+    return first, rest
+
+def encoding_profile_key(chunked: bool = False, renditions: bool = False, progressive: bool = False) -> str:
+    """같은 원본이라도 인코딩 설정이 다르면 결과를 재사용하지 않도록 설정값을 해시한 키
+
+    분배/게시 방식 설정은 그 영상에 적용될 때만 포함합니다 (짧은 영상 등은 해당 설정이 바뀌어도 같은 키).
+    """
+    profile = {
+        "version": PROFILE_VERSION,
+        "ladder": LADDER,
+        "segment_seconds": HLS_SEGMENT_SECONDS,
+        "segment_format": Settings.SEGMENT_FORMAT,
+        "complexity": Settings.COMPLEXITY_ANALYSIS,
+    }
+    # 분배/게시 방식에 따라 마스터 병합, 청크 접두어 세그먼트 이름, 청크별 EXT-X-MAP 등 결과 형태가 달라짐
+    if chunked:
+        profile["chunk_seconds"] = Settings.CHUNK_SECONDS
+    elif renditions:
+        profile["rendition_groups"] = Settings.RENDITION_GROUPS
+    elif progressive:
+        profile["fast_first_max_height"] = Settings.FAST_FIRST_MAX_HEIGHT
+    if Settings.AUDIO_MODE == "group":
+        profile["audio_group"] = audio_group_bitrates()
+    return hashlib.sha1(json.dumps(profile, sort_keys=True).encode()).hexdigest()[:12]
@@ -0,0 +1,85 @@
+import json, time
+from datetime import datetime, timedelta, timezone
+
+from app.core import Worker, Settings
+from app.core.enum import WorkerStatus
+from app.worker.redis_app import watch_state
+from app.worker.resources import ResourceSample
+from app.services.db_service import (
+    session_scope, insert_or_update_worker, insert_worker_metrics, rollup_worker_metrics, delete_worker_metrics_before
+)
+
+METRICS_BUFFER_PREFIX = "metrics:buffer:"
+# DB 적재가 멈춰도 Redis 버퍼가 무한히 커지지 않도록 최근 샘플만 유지
+MAX_BUFFERED_SAMPLES = 2000
+
+# (원본, 집계, date_trunc 단위, 구간 길이)
+ROLLUPS = (
+    ("raw", "1m", "minute", timedelta(minutes=1)),
+    ("1m", "1h", "hour", timedelta(hours=1)),
+)
+
+def _buffer_key(worker_name: str) -> str:
+    return f"{METRICS_BUFFER_PREFIX}{worker_name}"
+
+def buffer_sample(pipe, worker_name: str, sample: ResourceSample, status: str):
+    """하트비트 파이프라인에 샘플 적재 명령 추가 (DB 접근 없음)"""
+    key = _buffer_key(worker_name)
+    pipe.rpush(key, json.dumps({"ts": time.time(), "status": status, **sample.to_dict()}))
+    pipe.ltrim(key, -MAX_BUFFERED_SAMPLES, -1)
+
+def _metric_row(worker_name: str, sample: dict) -> dict:
+    return {
+        "hostname": worker_name,
+        "resolution": "raw",
+        "bucket": datetime.fromtimestamp(sample["ts"], tz=timezone.utc),
+        "cpu": sample["cpu"],
+        "cpu_max": sample["cpu"],
+        "memory": sample["memory"],
+        "memory_max": sample["memory"],
+        "rss_mb": sample["rss_mb"],
+        "read_mb_per_second": sample["read_mb_per_second"],
+        "write_mb_per_second": sample["write_mb_per_second"],
+        "scratch_free_gb": sample["scratch_free_gb"],
+        "samples": 1,
+    }
+
+def flush_metrics(worker_name: str):
+    """버퍼된 하트비트를 worker_metrics 에 일괄 적재하고 workers 행 갱신, 집계/보관 기간 정리"""
+    key = _buffer_key(worker_name)
+    buffered = watch_state.lrange(key, 0, -1)
+    if not buffered:
+        return
+
+    samples = [json.loads(item) for item in buffered]
+    latest = samples[-1]
+    now = datetime.now(timezone.utc)
+    retention = {
+        "raw": now - timedelta(hours=Settings.METRICS_RAW_RETENTION_HOURS),
+        "1m": now - timedelta(days=Settings.METRICS_MINUTE_RETENTION_DAYS),
+        "1h": now - timedelta(days=Settings.METRICS_HOUR_RETENTION_DAYS),
+    }
+
+    with session_scope() as db:
+        insert_worker_metrics([_metric_row(worker_name, sample) for sample in samples], db)
+        insert_or_update_worker(Worker(
+            hostname=worker_name,
+            cpu_usage=int(latest["cpu"]),
+            memory_usage=int(latest["memory"]),
+            status=WorkerStatus(latest["status"]),
+        ), db=db)
+        for source, resolution, unit, step in ROLLUPS:
+            rollup_worker_metrics(worker_name, source, resolution, unit, step, db)
+        for resolution, cutoff in retention.items():
+            delete_worker_metrics_before(worker_name, resolution, cutoff, db)
+
+    # 적재한 만큼만 제거 (그 사이 추가된 샘플은 다음 주기에 적재)
+    watch_state.ltrim(key, len(buffered), -1)
+
+def roof_flush_metrics(worker_name: str):
+    while True:
+        time.sleep(Settings.METRICS_FLUSH_INTERVAL)
+        try:
+            flush_metrics(worker_name)
+        except Exception as e:
+            print(f"워커 지표 적재 에러: {e}", flush=True)
@@ -0,0 +1,56 @@
+import m3u8
+
+# ffmpeg 가 마스터 BANDWIDTH 에 더하는 여유분(10%) 과 같은 비율
+BANDWIDTH_OVERHEAD = 1.1
+DEFAULT_AUDIO_CODEC = "mp4a.40.2"
+AUDIO_CODEC_PREFIXES = ("mp4a", "ac-3", "ec-3", "opus", "flac", "fLaC")
+
+def _split_codecs(codecs: str | None) -> list[str]:
+    return [codec.strip() for codec in (codecs or "").split(",") if codec.strip()]
+
+def _group_audio_codec(playlists) -> str:
+    # 이미 오디오 그룹을 참조하는 화질의 CODECS 에서 오디오 코덱을 찾음 (없으면 AAC-LC)
+    for playlist in playlists:
+        if any(media.type == "AUDIO" for media in playlist.media):
+            for codec in _split_codecs(playlist.stream_info.codecs):
+                if codec.startswith(AUDIO_CODEC_PREFIXES):
+                    return codec
+    return DEFAULT_AUDIO_CODEC
+
+def merge_master_playlists(masters: list[str], audio_bandwidth: int = 0) -> str:
+    """여러 마스터 플레이리스트의 화질 목록을 하나로 합침 (대역폭 오름차순, 같은 URI 는 나중 것 사용)
+
+    오디오 그룹(EXT-X-MEDIA) 은 한 작업에서만 인코딩되므로, 그룹을 참조하지 않는 화질은 병합 결과의 오디오 그룹을 참조하도록 맞춥니다.
+    이때 CODECS 에 그룹의 오디오 코덱을, BANDWIDTH 에 그룹의 최대 오디오 비트레이트(audio_bandwidth, bps) 를 더해
+    CODECS/BANDWIDTH 가 참조하는 렌디션까지 포함하도록 합니다.
+    """
+    parsed = [m3u8.loads(content) for content in masters]
+    merged = parsed[0]
+
+    by_uri = {}
+    media_by_name = {}
+    for master in parsed:
+        for media in master.media:
+            media_by_name[(media.type, media.group_id, media.name)] = media
+        for playlist in master.playlists:
+            by_uri[playlist.uri] = playlist
+
+    merged.media[:] = list(media_by_name.values())
+    audio = next((media for media in merged.media if media.type == "AUDIO"), None)
+    if audio is not None:
+        audio_codec = _group_audio_codec(by_uri.values())
+        for playlist in by_uri.values():
+            if any(media.type == "AUDIO" for media in playlist.media):
+                continue
+            playlist.media.append(audio)
+            stream_info = playlist.stream_info
+            codecs = _split_codecs(stream_info.codecs)
+            if codecs and audio_codec not in codecs:
+                stream_info.codecs = ",".join(codecs + [audio_codec])
+            if stream_info.bandwidth:
+                stream_info.bandwidth += int(audio_bandwidth * BANDWIDTH_OVERHEAD)
+            if stream_info.average_bandwidth:
+                stream_info.average_bandwidth += int(audio_bandwidth * BANDWIDTH_OVERHEAD)
+
+    merged.playlists[:] = sorted(by_uri.values(), key=lambda playlist: playlist.stream_info.bandwidth or 0)
+    return merged.dumps()
@@ -0,0 +1,92 @@
+import json, subprocess
+from dataclasses import dataclass, asdict, fields
+
+from app.core.config import Settings
+
+def is_remote(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+def input_options(source: str) -> list[str]:
+    if not is_remote(source):
+        return []
+    # 네트워크 입력이 끊겨도 이어서 읽도록 재연결 옵션 지정
+    return ["-reconnect", "1", "-reconnect_on_network_error", "1", "-reconnect_delay_max", "5"]
+
+def probe_options(source: str) -> list[str]:
+    if not is_remote(source):
+        return []
+    # 원격 입력은 앞부분(또는 moov atom) 만 읽고 분석 종료
+    return ["-probesize", str(Settings.INPUT_PROBE_SIZE), "-analyzeduration", "5000000", *input_options(source)]
+
+@dataclass
+class MediaInfo:
+    duration: float
+    width: int
+    height: int
+    fps: float
+    bit_rate: int
+    has_audio: bool
+    video_codec: str = ""
+    audio_codec: str = ""
+    format_name: str = ""
+    # Presigned URL 로 분석에 성공했는지 (실패했다면 재시도 시 바로 로컬 다운로드)
+    streamable: bool = False
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "MediaInfo":
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+def _parse_frame_rate(rate: str) -> float:
+    try:
+        num, den = rate.split('/') if '/' in rate else (rate, 1)
+        return float(num) / float(den) if float(den) else 0.0
+    except ValueError:
+        return 0.0
+
+def probe_media(source: str) -> MediaInfo | None:
+    """ffprobe 한 번으로 컨테이너/스트림 정보를 모두 읽어 MediaInfo 로 반환"""
+    command = ["ffprobe", "-v", "error", *probe_options(source), "-show_streams", "-show_format", "-of", "json", source]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=True)
+        probe = json.loads(result.stdout)
+    except (subprocess.CalledProcessError, ValueError) as e:
+        print(f"Error probing media: {e}", flush=True)
+        return None
+
+    streams = probe.get("streams", [])
+    container = probe.get("format", {})
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+    if video is None:
+        print(f"Error probing media: no video stream in {container.get('format_name')}", flush=True)
+        return None
+
+    width, height = int(video.get("width", 0)), int(video.get("height", 0))
+    rotation = video.get("tags", {}).get("rotate") or next(
+        (side.get("rotation") for side in video.get("side_data_list", []) if "rotation" in side), 0
+    )
+    # 회전 메타데이터가 있는 세로 촬영 영상은 표시 기준 해상도로 변환
+    if abs(int(rotation)) % 180 == 90:
+        width, height = height, width
+
+    try:
+        duration = float(container.get("duration") or video.get("duration") or 0)
+    except ValueError:
+        duration = 0.0
+
+    return MediaInfo(
+        duration=duration,
+        width=width,
+        height=height,
+        fps=_parse_frame_rate(video.get("avg_frame_rate", "0/0")),
+        bit_rate=int(video.get("bit_rate") or container.get("bit_rate") or 0),
+        has_audio=audio is not None,
+        video_codec=video.get("codec_name", ""),
+        audio_codec=audio.get("codec_name", "") if audio else "",
+        format_name=container.get("format_name", ""),
+        streamable=is_remote(source),
+    )
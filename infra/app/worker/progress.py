@@ -0,0 +1,114 @@
+import time
+
+from app.core.config import Settings
+from app.worker.redis_app import watch_state, async_watch_state
+from app.worker.events import publish_event
+from app.services.db_service import session_scope, bulk_update_job_progress
+
+PROGRESS_KEY_PREFIX = "progress:"
+PROGRESS_DIRTY_KEY = "progress:dirty"
+# 워커별 인코딩 중인 작업의 속도(실시간 대비 배수): realtime:<워커>:<작업>
+REALTIME_KEY_PREFIX = "realtime:"
+PROGRESS_TTL_SECONDS = 86400
+# 속도는 인코딩 중에만 갱신되므로 짧게 만료 (다른 워커에서 끝나거나 비정상 종료된 작업도 하트비트 합계에서 빠짐)
+SPEED_TTL_SECONDS = 15
+SPEED_REFRESH_SECONDS = 5
+FLUSH_BATCH_SIZE = 500
+
+def _progress_key(job_id: str) -> str:
+    return f"{PROGRESS_KEY_PREFIX}{job_id}"
+
+def _speed_key(job_id: str) -> str:
+    return f"{REALTIME_KEY_PREFIX}{Settings.WORKER_NAME}:{job_id}"
+
+def publish_progress(job_id: str, progress: int, **fields):
+    """작업 진행 상황을 Redis 해시에 기록하고 DB 일괄 적재 대상으로 표시"""
+    key = _progress_key(str(job_id))
+    pipe = watch_state.pipeline()
+    pipe.hset(key, mapping={"progress": progress, "updated_at": time.time(), **fields})
+    pipe.expire(key, PROGRESS_TTL_SECONDS)
+    pipe.sadd(PROGRESS_DIRTY_KEY, str(job_id))
+    publish_event("progress", {"id": str(job_id), "progress": progress, **fields}, pipe)
+    pipe.execute()
+
+def clear_progress(job_id: str):
+    # 최종 상태가 DB 에 기록된 작업은 Redis 진행 상황 제거
+    pipe = watch_state.pipeline()
+    pipe.delete(_progress_key(str(job_id)))
+    pipe.srem(PROGRESS_DIRTY_KEY, str(job_id))
+    pipe.delete(_speed_key(str(job_id)))
+    pipe.execute()
+
+def record_speed(job_id: str, speed: float):
+    # 인코딩 중 SPEED_REFRESH_SECONDS 마다 다시 기록해 만료 연장
+    watch_state.set(_speed_key(str(job_id)), speed, ex=SPEED_TTL_SECONDS)
+
+def realtime_factor() -> float:
+    """이 워커에서 인코딩 중인 작업 속도 합 (1.0 = 실시간 1배)"""
+    keys = list(watch_state.scan_iter(match=f"{REALTIME_KEY_PREFIX}{Settings.WORKER_NAME}:*", count=100))
+    if not keys:
+        return 0.0
+    return round(sum(float(speed) for speed in watch_state.mget(keys) if speed is not None), 2)
+
+def read_progress(job_ids: list[str]) -> dict[str, dict]:
+    """작업별 실시간 진행 상황 (파이프라인 HGETALL 1회)"""
+    pipe = watch_state.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hgetall(_progress_key(job_id))
+    return {job_id: info for job_id, info in zip(job_ids, pipe.execute()) if info}
+
+async def read_progress_async(job_ids: list[str]) -> dict[str, dict]:
+    # manager 비동기 핸들러용 read_progress
+    pipe = async_watch_state.pipeline(transaction=False)
+    for job_id in job_ids:
+        pipe.hgetall(_progress_key(job_id))
+    return {job_id: info for job_id, info in zip(job_ids, await pipe.execute()) if info}
+
+class ProgressPublisher:
+    """진행률 변화량(PROGRESS_MIN_DELTA) 과 간격(PROGRESS_MIN_INTERVAL) 을 모두 넘을 때만 Redis 에 기록"""
+
+    def __init__(self, job_id: str, min_delta: int | None = None, min_interval: float | None = None):
+        self.job_id = str(job_id)
+        self.min_delta = Settings.PROGRESS_MIN_DELTA if min_delta is None else min_delta
+        self.min_interval = Settings.PROGRESS_MIN_INTERVAL if min_interval is None else min_interval
+        self.last_progress = -1
+        self.last_published = 0.0
+
+    def update(self, progress: int, force: bool = False, **fields) -> bool:
+        progress = min(progress, 100)
+        now = time.monotonic()
+        if not force:
+            if progress - self.last_progress < self.min_delta and progress < 100:
+                return False
+            if now - self.last_published < self.min_interval:
+                return False
+
+        publish_progress(self.job_id, progress, **fields)
+        self.last_progress = max(self.last_progress, progress)
+        self.last_published = now
+        return True
+
+def flush_progress() -> int:
+    """변경된 작업 진행률을 모아 한 번의 executemany UPDATE 로 DB 반영"""
+    job_ids = watch_state.spop(PROGRESS_DIRTY_KEY, FLUSH_BATCH_SIZE)
+    if not job_ids:
+        return 0
+
+    progress = read_progress(job_ids)
+    rows = [{"job_id": job_id, "new_progress": int(info["progress"])} for job_id, info in progress.items()]
+    try:
+        with session_scope() as db:
+            bulk_update_job_progress(rows, db)
+    except Exception:
+        # 다음 주기에 다시 적재
+        watch_state.sadd(PROGRESS_DIRTY_KEY, *job_ids)
+        raise
+    return len(rows)
+
+def roof_flush_progress():
+    while True:
+        time.sleep(Settings.PROGRESS_FLUSH_INTERVAL)
+        try:
+            flush_progress()
+        except Exception as e:
+            print(f"진행률 적재 에러: {e}", flush=True)
@@ -1,3 +1,6 @@
 import redis
+import redis.asyncio
 
-watch_state = redis.StrictRedis(host='redis', port=6379, db=1, decode_responses=True)
\ No newline at end of file
+watch_state = redis.StrictRedis(host='redis', port=6379, db=1, decode_responses=True)
+# manager(FastAPI) 비동기 핸들러용
+async_watch_state = redis.asyncio.Redis(host='redis', port=6379, db=1, decode_responses=True)
\ No newline at end of file
@@ -0,0 +1,108 @@
+import os, time, shutil, psutil
+from dataclasses import dataclass, asdict
+
+MB = 1024 * 1024
+GB = 1024 * MB
+
+@dataclass
+class ResourceSample:
+    cpu: float
+    memory: float
+    rss_mb: float
+    read_mb_per_second: float
+    write_mb_per_second: float
+    scratch_free_gb: float
+    process_count: int
+
+    def to_dict(self) -> dict:
+        return {key: round(value, 2) if isinstance(value, float) else value for key, value in asdict(self).items()}
+
+class ResourceSampler:
+    """워커 프로세스 트리(프리포크 자식, ffmpeg 포함)의 자원 사용량을 대기 없이 측정
+
+    프로세스 핸들과 직전 CPU 시간/IO 누적값을 보관해 두고 호출 간 차이로 사용률을 계산하므로
+    `cpu_percent(interval=1)` 처럼 자식 수만큼 잠들지 않습니다.
+    """
+
+    def __init__(self, scratch_dir: str = "storage", root_pid: int | None = None):
+        self.scratch_dir = scratch_dir
+        self.root = psutil.Process(root_pid or os.getpid())
+        self.core_count = max(1, psutil.cpu_count() or 1)
+        self.total_memory = psutil.virtual_memory().total
+        self._processes: dict[int, psutil.Process] = {}
+        self._cpu_times: dict[int, float] = {}
+        self._io_bytes: dict[int, tuple[int, int]] = {}
+        self._last_time = time.time()
+        # 첫 호출로 기준값 채움
+        self.sample()
+
+    def _process_tree(self) -> list[psutil.Process]:
+        try:
+            current = [self.root] + self.root.children(recursive=True)
+        except psutil.NoSuchProcess:
+            current = []
+
+        processes = {}
+        for process in current:
+            # 같은 pid 의 기존 핸들을 재사용 (pid 재사용 여부는 psutil 이 생성 시각으로 구분)
+            primed = self._processes.get(process.pid)
+            processes[process.pid] = primed if primed is not None and primed == process else process
+        self._processes = processes
+        return list(processes.values())
+
+    def sample(self) -> ResourceSample:
+        now = time.time()
+        elapsed = max(now - self._last_time, 1e-6)
+
+        cpu_seconds = 0.0
+        rss = 0
+        read_bytes = 0
+        write_bytes = 0
+        cpu_times: dict[int, float] = {}
+        io_bytes: dict[int, tuple[int, int]] = {}
+
+        for process in self._process_tree():
+            try:
+                with process.oneshot():
+                    times = process.cpu_times()
+                    used = times.user + times.system
+                    rss += process.memory_info().rss
+                    # 이번 구간에 새로 뜬 프로세스는 시작 시점부터, 기존 프로세스는 직전 측정값부터 계산
+                    born_in_window = process.create_time() >= self._last_time
+                    previous = self._cpu_times.get(process.pid, 0.0 if born_in_window else used)
+                    cpu_seconds += max(0.0, used - previous)
+                    cpu_times[process.pid] = used
+
+                    try:
+                        io = process.io_counters()
+                        previous_read, previous_write = self._io_bytes.get(
+                            process.pid, (0, 0) if born_in_window else (io.read_bytes, io.write_bytes)
+                        )
+                        read_bytes += max(0, io.read_bytes - previous_read)
+                        write_bytes += max(0, io.write_bytes - previous_write)
+                        io_bytes[process.pid] = (io.read_bytes, io.write_bytes)
+                    except (psutil.AccessDenied, AttributeError):
+                        pass
+            except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
+                continue
+
+        self._cpu_times = cpu_times
+        self._io_bytes = io_bytes
+        self._last_time = now
+
+        return ResourceSample(
+            cpu=min(100.0, cpu_seconds / elapsed / self.core_count * 100),
+            memory=rss / self.total_memory * 100,
+            rss_mb=rss / MB,
+            read_mb_per_second=read_bytes / MB / elapsed,
+            write_mb_per_second=write_bytes / MB / elapsed,
+            scratch_free_gb=self._scratch_free() / GB,
+            process_count=len(cpu_times),
+        )
+
+    def _scratch_free(self) -> int:
+        try:
+            os.makedirs(self.scratch_dir, exist_ok=True)
+            return shutil.disk_usage(self.scratch_dir).free
+        except OSError:
+            return 0
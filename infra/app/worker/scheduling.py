@@ -0,0 +1,54 @@
+from app.core.config import Settings
+from app.worker.redis_app import watch_state
+
+# 워커 부하 점수 정렬 집합 (낮을수록 여유) 과 워커별 대기 작업 수
+WORKER_LOAD_KEY = "workers:load"
+WORKER_QUEUED_KEY = "workers:queued"
+STATUS_KEY_PREFIX = "status:"
+CANDIDATE_COUNT = 3
+
+def _queued_weight() -> float:
+    return Settings.QUEUED_JOB_WEIGHT
+
+def update_load(worker_name: str, resource_score: float, overloaded: bool):
+    """하트비트마다 호출: 자원 점수 + 대기 작업 가중치로 부하 점수 갱신"""
+    queued = max(0, int(watch_state.hget(WORKER_QUEUED_KEY, worker_name) or 0))
+    score = resource_score + queued * _queued_weight()
+    if overloaded:
+        # 과부하 워커는 선택 구간(< WORKER_OVERLOAD_SCORE) 밖으로 밀어냄
+        score += Settings.WORKER_OVERLOAD_SCORE
+    watch_state.zadd(WORKER_LOAD_KEY, {worker_name: score})
+
+def record_dispatch(worker_name: str):
+    pipe = watch_state.pipeline()
+    pipe.hincrby(WORKER_QUEUED_KEY, worker_name, 1)
+    pipe.zincrby(WORKER_LOAD_KEY, _queued_weight(), worker_name)
+    pipe.execute()
+
+def record_start(worker_name: str):
+    pipe = watch_state.pipeline()
+    pipe.hincrby(WORKER_QUEUED_KEY, worker_name, -1)
+    pipe.zincrby(WORKER_LOAD_KEY, -_queued_weight(), worker_name)
+    queued, _ = pipe.execute()
+    if queued < 0:
+        watch_state.hset(WORKER_QUEUED_KEY, worker_name, 0)
+
+def pick_worker() -> dict | None:
+    """과부하가 아닌 워커 중 부하 점수가 가장 낮은 워커 선택 (ZRANGEBYSCORE 1회 + 후보 상태 파이프라인 1회)"""
+    candidates = watch_state.zrangebyscore(
+        WORKER_LOAD_KEY, "-inf", f"({Settings.WORKER_OVERLOAD_SCORE}", start=0, num=CANDIDATE_COUNT
+    )
+    if not candidates:
+        return None
+
+    pipe = watch_state.pipeline(transaction=False)
+    for name in candidates:
+        pipe.hgetall(f"{STATUS_KEY_PREFIX}{name}")
+
+    for name, info in zip(candidates, pipe.execute()):
+        if not info:
+            # 하트비트가 만료된 워커는 후보에서 제거
+            watch_state.zrem(WORKER_LOAD_KEY, name)
+            continue
+        return {"hostname": name, "id": info["id"], "status": info["status"]}
+    return None
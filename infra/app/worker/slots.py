@@ -0,0 +1,116 @@
+import math, os, time, uuid, psutil
+from contextlib import contextmanager
+
+from app.core.config import Settings
+from app.worker.redis_app import watch_state
+from app.worker.ladder import ladder_pixels
+
+SLOT_KEY_PREFIX = "slots:"
+REFERENCE_PIXELS = 1920 * 1080
+
+def _slot_key() -> str:
+    return f"{SLOT_KEY_PREFIX}{Settings.WORKER_NAME}"
+
+def _turnstile_key() -> str:
+    return f"{SLOT_KEY_PREFIX}{Settings.WORKER_NAME}:turnstile"
+
+def _lease_key() -> str:
+    # 예약자별 만료 시각 (score)
+    return f"{SLOT_KEY_PREFIX}{Settings.WORKER_NAME}:leases"
+
+def _held_key(holder: str) -> str:
+    # 예약자가 점유한 슬롯 토큰 (BLMOVE 로 옮겨 와 점유와 기록이 원자적)
+    return f"{SLOT_KEY_PREFIX}{Settings.WORKER_NAME}:held:{holder}"
+
+def _held_turnstile_key(holder: str) -> str:
+    return f"{_held_key(holder)}:turnstile"
+
+def worker_capacity() -> int:
+    """워커 동시 작업 슬롯 수: WORKER_SLOTS 지정값, 없으면 코어/메모리 기준 산정"""
+    if Settings.WORKER_SLOTS > 0:
+        return Settings.WORKER_SLOTS
+    cores = psutil.cpu_count() or 1
+    memory_gb = psutil.virtual_memory().total / 1024 ** 3
+    return max(1, min(cores // Settings.CORES_PER_SLOT, int(memory_gb // Settings.MEMORY_GB_PER_SLOT)))
+
+def ladder_slots(ladder: list[dict]) -> int:
+    """화질 사다리 전체 픽셀 수 기준 작업 비용 (1080p SLOT_1080P_RUNGS 개 분량 = 1 슬롯)"""
+    cost = math.ceil(ladder_pixels(ladder) / (REFERENCE_PIXELS * Settings.SLOT_1080P_RUNGS))
+    return max(1, min(worker_capacity(), cost))
+
+def free_slots() -> int:
+    return watch_state.llen(_slot_key())
+
+def _lease_expiry() -> float:
+    return time.time() + Settings.SLOT_LEASE_SECONDS
+
+def _return_tokens(holder: str):
+    """예약자가 점유한 슬롯/턴스타일 토큰을 원래 목록으로 반환"""
+    for source, target in ((_held_key(holder), _slot_key()), (_held_turnstile_key(holder), _turnstile_key())):
+        while watch_state.lmove(source, target, "LEFT", "RIGHT") is not None:
+            pass
+
+def init_slots():
+    """워커 시작 시 슬롯 토큰 목록과 예약 순서용 턴스타일 초기화"""
+    capacity = worker_capacity()
+    pipe = watch_state.pipeline()
+    for key in watch_state.scan_iter(match=_held_key("*")):
+        pipe.delete(key)
+    pipe.delete(_slot_key(), _turnstile_key(), _lease_key())
+    pipe.rpush(_slot_key(), *range(capacity))
+    pipe.rpush(_turnstile_key(), 1)
+    pipe.execute()
+    print(f"작업 슬롯 초기화: {Settings.WORKER_NAME} {capacity}개", flush=True)
+
+def refresh_leases():
+    """하트비트마다 호출: 예약한 프로세스가 살아 있는 임대만 연장 (SIGKILL/OOM 으로 죽은 작업은 만료되도록 둠)"""
+    expiry = _lease_expiry()
+    alive = {
+        holder: expiry for holder in watch_state.zrange(_lease_key(), 0, -1)
+        if psutil.pid_exists(int(holder.split(":", 1)[0]))
+    }
+    if alive:
+        watch_state.zadd(_lease_key(), alive, xx=True)
+
+def reclaim_expired_leases() -> int:
+    """만료된 임대의 토큰을 반환 (ZREM 에 성공한 쪽만 반환하므로 여러 곳에서 호출해도 한 번만 반환)"""
+    reclaimed = 0
+    for holder in watch_state.zrangebyscore(_lease_key(), "-inf", time.time()):
+        if watch_state.zrem(_lease_key(), holder):
+            _return_tokens(holder)
+            reclaimed += 1
+            print(f"만료된 슬롯 임대 회수: {holder}", flush=True)
+    return reclaimed
+
+def _acquire(source: str, target: str, holder: str):
+    # 무기한 대기 대신 SLOT_WAIT_SECONDS 마다 임대를 연장하고 만료 임대를 회수한 뒤 다시 대기
+    while True:
+        if watch_state.blmove(source, target, Settings.SLOT_WAIT_SECONDS, "LEFT", "RIGHT") is not None:
+            return
+        watch_state.zadd(_lease_key(), {holder: _lease_expiry()})
+        reclaim_expired_leases()
+
+@contextmanager
+def reserve_slots(cost: int):
+    """슬롯이 빌 때까지 BLMOVE 로 대기 후 점유 (재시도 폴링 없음)
+
+    여러 슬롯이 필요한 작업끼리 일부만 잡은 채 교착되지 않도록 턴스타일을 잡은 작업만 슬롯을 가져가며,
+    대기 순서는 BLMOVE 의 FIFO 순서를 따릅니다. 점유는 SLOT_LEASE_SECONDS 임대로 기록되어
+    프로세스가 비정상 종료되면 하트비트가 연장하지 않아 만료 후 회수됩니다.
+    """
+    cost = max(1, min(cost, worker_capacity()))
+    holder = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    watch_state.zadd(_lease_key(), {holder: _lease_expiry()})
+
+    try:
+        _acquire(_turnstile_key(), _held_turnstile_key(holder), holder)
+        try:
+            for _ in range(cost):
+                _acquire(_slot_key(), _held_key(holder), holder)
+        finally:
+            watch_state.lmove(_held_turnstile_key(holder), _turnstile_key(), "LEFT", "RIGHT")
+        yield
+    finally:
+        # 이미 회수된 임대(만료) 면 토큰도 반환된 상태
+        if watch_state.zrem(_lease_key(), holder):
+            _return_tokens(holder)
@@ -1,144 +1,812 @@
-import m3u8, psutil, shutil, os, subprocess, threading, re, time
+import m3u8, shutil, os, subprocess, threading, time, math, json
+from datetime import datetime, timezone, timedelta
 
+from celery import chord
 from celery.signals import worker_ready
 from app.core import Video, EncodingJob, Settings, Worker
 from app.core.enum import VideoStatus, JobStatus, WorkerStatus
 from app.worker.celery_app import celery_app
 from app.worker.redis_app import watch_state
-from app.services.s3_service import S3Service
+from app.worker.ladder import (
+    build_ladder, encoding_profile_key, rung_name, ladder_pixels, split_ladder, audio_group_bitrates, audio_rendition_name,
+    audio_group_bandwidth, HLS_SEGMENT_SECONDS, AUDIO_GROUP_ID
+)
+from app.worker.playlists import merge_master_playlists
+from app.worker.catalog import add_to_catalog, rebuild_catalog
+from app.worker.dedupe import register_encoded
+from app.worker.scheduling import record_start, update_load
+from app.worker.resources import ResourceSampler, ResourceSample
+from app.worker.metrics import buffer_sample, roof_flush_metrics
+from app.worker.events import publish_event, track_status_changes
+from app.worker.progress import ProgressPublisher, publish_progress, clear_progress, record_speed, realtime_factor, roof_flush_progress, SPEED_REFRESH_SECONDS
+from app.worker.ffmpeg_runner import FfmpegProgress, run_ffmpeg
+from app.worker.slots import (
+    init_slots, reserve_slots, ladder_slots, worker_capacity, free_slots, refresh_leases, reclaim_expired_leases
+)
+from app.worker.analysis import analyze_complexity
+from app.worker.probe import MediaInfo, probe_media, input_options
+from app.services.s3_service import S3Service, TransferStats
+from app.services.hls_uploader import HlsStreamUploader
 from app.services.db_service import (
-    insert_or_update_video, insert_or_update_job, insert_or_update_worker, select_entity, session_scope, update_job_progress
+    insert_or_update_video, insert_or_update_job, register_worker, select_entity, session_scope,
+    select_video_by_etag
 )
 
 s3_service = S3Service()
+# 워커/감시 프로세스의 영상·작업 상태 변경을 대시보드로 발행
+track_status_changes()
+
+CHUNK_DONE_PREFIX = "count:chunk:"
+RENDITION_DONE_PREFIX = "count:rendition:"
+# 청크/화질 묶음 중 하나가 실패한 작업: 아직 인코딩 중인 작업은 끝난 뒤 자기 업로드를 정리
+PART_FAILED_PREFIX = "failed:part:"
+PART_FAILED_TTL_SECONDS = 86400
+# S3 LastModified 와 DB 시각 차이 여유
+CLEANUP_CLOCK_MARGIN = timedelta(minutes=1)
+FMP4_MEDIA_EXTENSION = ".mp4"
+ANALYSIS_PREFIX = "analysis:"
+PROBE_PREFIX = "probe:"
+
+def get_cached_media_info(s3_upload_video : Video) -> MediaInfo | None:
+    """ETag 기준 분석 결과 조회: 현재 레코드 -> Redis -> 같은 ETag 의 다른 레코드 순"""
+    source_info = (s3_upload_video.encoding_json or {}).get("source")
+    if source_info:
+        return MediaInfo.from_dict(source_info)
+
+    cached = watch_state.get(f"{PROBE_PREFIX}{s3_upload_video.s3_etag}")
+    if cached:
+        return MediaInfo.from_dict(json.loads(cached))
+
+    with session_scope() as db:
+        same_content = select_video_by_etag(s3_upload_video.s3_etag, db=db)
+        if same_content:
+            media_info = MediaInfo.from_dict(same_content.encoding_json["source"])
+            _cache_media_info(s3_upload_video.s3_etag, media_info)
+            return media_info
+    return None
+
+def _cache_media_info(etag: str, media_info: MediaInfo):
+    watch_state.set(f"{PROBE_PREFIX}{etag}", json.dumps(media_info.to_dict()), ex=Settings.ETAG_CACHE_TTL)
+
+def _probe_and_cache(s3_upload_video : Video, source: str) -> MediaInfo | None:
+    media_info = probe_media(source)
+    if media_info:
+        _cache_media_info(s3_upload_video.s3_etag, media_info)
+    return media_info
+
+def resolve_input(s3_upload_video : Video, input_local: str) -> tuple[str, MediaInfo | None, list[TransferStats]]:
+    """ffmpeg 입력 경로 결정: 가능하면 Presigned GET URL 로 스트리밍, 아니면 로컬 다운로드
+
+    같은 ETag 의 분석 결과가 있으면 ffprobe 를 다시 실행하지 않습니다.
+    """
+    extension = s3_upload_video.filename.rsplit('.', 1)[-1].lower()
+    media_info = get_cached_media_info(s3_upload_video)
+
+    if Settings.INPUT_MODE == "stream" and extension not in Settings.LOCAL_INPUT_EXTENSIONS \
+            and (media_info is None or media_info.streamable):
+        url = s3_service.create_presigned_url_for_get(
+            Settings.UPLOAD_BUCKET_NAME, s3_upload_video.original_path, expiration=Settings.INPUT_URL_EXPIRATION
+        )
+        if url and media_info is None:
+            media_info = _probe_and_cache(s3_upload_video, url)
+        if url and media_info:
+            return url, media_info, []
+        print(f"스트리밍 입력 분석 실패, 로컬 다운로드로 전환: {s3_upload_video.original_path}", flush=True)
+
+    transfers = [s3_service.download_file(Settings.UPLOAD_BUCKET_NAME, s3_upload_video.original_path, input_local)]
+    if media_info is None:
+        media_info = _probe_and_cache(s3_upload_video, input_local)
+    return input_local, media_info, transfers
+
+def get_complexity(s3_upload_video : Video, source: str, total_duration: float) -> dict | None:
+    """복잡도 분석 결과 조회: 이전 인코딩 기록 -> ETag 캐시 -> 새 분석 순"""
+    if not Settings.COMPLEXITY_ANALYSIS:
+        return None
+
+    previous = (s3_upload_video.encoding_json or {}).get("complexity")
+    if previous:
+        return previous
+
+    cache_key = f"{ANALYSIS_PREFIX}{s3_upload_video.s3_etag}"
+    cached = watch_state.get(cache_key)
+    if cached:
+        return json.loads(cached)
 
-LOCK_KEY_PREFIX = "lock:worker:"
-LOCK_EXPIRATION_SECONDS = 1800
-MASTER_COUNT_PREFIX ="count:master:"
-
-def _get_duration(file_path: str) -> float:
-    command = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", file_path]
     try:
-        result = subprocess.run(command, capture_output=True, text=True, check=True)
-        return float(result.stdout.strip())
+        complexity = analyze_complexity(source, total_duration, input_options(source))
     except (subprocess.CalledProcessError, ValueError) as e:
-        print(f"Error getting video duration: {e}", flush=True)
-        return 0.0
-
-def _parse_time_to_seconds(time_str: str) -> float:
-    try:
-        h, m, s = map(float, time_str.split(':'))
-        return h * 3600 + m * 60 + s
-    except ValueError:
-        return 0.0
-
-@celery_app.task(name="encode_hls_task", bind=True)
-def process_encode(self, video_id : str, job_id: str):
-    lock_key = f"{LOCK_KEY_PREFIX}{Settings.WORKER_NAME}"
-    is_lock_acquired = watch_state.set(lock_key, "BUSY", nx=True, ex=LOCK_EXPIRATION_SECONDS)
-
-    if not is_lock_acquired:
-        print(f"30초 후 재시도합니다. (Task ID: {self.request.id})", flush=True)
-        raise self.retry(countdown=30, max_retries=120)
-
-    try:
+        print(f"복잡도 분석 실패, 기본 비트레이트 사용: {e}", flush=True)
+        return None
+
+    watch_state.set(cache_key, json.dumps(complexity), ex=Settings.ETAG_CACHE_TTL)
+    print(f"  [복잡도 분석] {s3_upload_video.filename} 배율 {complexity['factor']}", flush=True)
+    return complexity
+
+def estimate_slots(s3_upload_video : Video) -> int:
+    """작업에 필요한 슬롯 수: 원본 분석 결과로 만든 화질 사다리 기준 (분석 불가 시 전체 슬롯)"""
+    media_info = get_cached_media_info(s3_upload_video)
+    if media_info is None and Settings.INPUT_MODE == "stream":
+        url = s3_service.create_presigned_url_for_get(
+            Settings.UPLOAD_BUCKET_NAME, s3_upload_video.original_path, expiration=Settings.INPUT_URL_EXPIRATION
+        )
+        if url:
+            media_info = _probe_and_cache(s3_upload_video, url)
+
+    if media_info is None or not media_info.width or not media_info.height:
+        return worker_capacity()
+    ladder = build_ladder(media_info.width, media_info.height, media_info.bit_rate)
+    if _use_chunked_encode(media_info.duration) or _use_rendition_encode(ladder):
+        # 작업 분배만 하고 실제 인코딩은 청크/화질 작업이 각자 슬롯 예약
+        return 1
+    if _use_progressive_publish(media_info.duration):
+        # 빠른 게시 단계는 낮은 화질만 인코딩
+        ladder, _ = split_ladder(ladder, Settings.FAST_FIRST_MAX_HEIGHT)
+    return ladder_slots(ladder)
+
+@celery_app.task(name="encode_hls_task")
+def process_encode(video_id : str, job_id: str):
+    # 워커 큐 대기 작업 수에서 제외: 조회/분석/슬롯 대기 중 예외가 나도 카운터가 남지 않도록 가장 먼저
+    record_start(Settings.WORKER_NAME)
+
+    with session_scope() as db:
+        s3_upload_video = select_entity(Video, video_id, db = db)
+    cost = estimate_slots(s3_upload_video)
+
+    print(f"--- [슬롯 대기] {s3_upload_video.original_path} 필요 슬롯: {cost} ---", flush=True)
+    with reserve_slots(cost):
         with session_scope() as db:
             s3_upload_video = select_entity(Video, video_id, db = db)
             current_job = select_entity(EncodingJob, job_id, db = db)
 
             print(f"--- [작업 시작] 파일: {s3_upload_video.original_path} ---", flush=True)
-            encode_hls(s3_upload_video, current_job, db)
+            backfill = encode_hls(s3_upload_video, current_job, db)
             print(f"--- [작업 완료] {s3_upload_video.original_path} 처리 끝 ---", flush=True)
 
-    finally:
-        watch_state.delete(lock_key)
+    # 빠른 게시 상태가 커밋된 뒤에 나머지 화질 작업 등록
+    if backfill:
+        encode_backfill.apply_async(args=[video_id, job_id, *backfill], priority=Settings.BACKFILL_PRIORITY)
 
-def encode_hls(s3_upload_video : Video, current_job: EncodingJob, db):
-    print(f"--- [인코딩 시작] {s3_upload_video.filename}---", flush=True)
-    base_name = s3_upload_video.filename
-    work_dir = f"storage/tmp_{base_name.split('.')[0]}"
-    input_local = f"storage/{base_name}"
+def _variant_names(plan: dict) -> list[str]:
+    names = [rung_name(rung) for rung in plan["ladder"]]
+    if plan["has_audio"] and plan.get("audio_group"):
+        names += [audio_rendition_name(idx) for idx in range(len(plan["audio_group"]))]
+    return names
 
+def _prepare_work_dir(work_dir: str, plan: dict):
     os.makedirs(work_dir, exist_ok=True)
 
-    for i in range(6):
-        target_dir = os.path.join(work_dir, str(i))
+    for name in _variant_names(plan):
+        target_dir = os.path.join(work_dir, name)
         if not os.path.exists(target_dir):
             os.makedirs(target_dir, exist_ok=True)
 
+def _start_segment_uploader(work_dir: str, s3_prefix: str) -> HlsStreamUploader | None:
+    # fMP4 단일 파일은 인코딩이 끝나야 완성되므로 게시 시점에 한 번에 업로드
+    if Settings.SEGMENT_FORMAT == "fmp4":
+        return None
+    return HlsStreamUploader(s3_service, work_dir, Settings.HLS_BUCKET_NAME, s3_prefix).start()
+
+def _video_only(plan: dict) -> dict:
+    # 오디오 그룹 모드에서는 오디오를 한 작업에서만 인코딩하고 나머지는 영상만 인코딩 (마스터 병합 시 같은 그룹 참조)
+    return {**plan, "has_audio": False} if plan.get("audio_group") else plan
+
+def _use_progressive_publish(total_duration: float) -> bool:
+    # 긴 영상은 청크 병렬 인코딩, 화질 분배 모드는 화질별 병렬 인코딩이 우선
+    return Settings.PROGRESSIVE_PUBLISH and Settings.ENCODE_MODE == "single" and not _use_chunked_encode(total_duration)
+
+def _progress_reporter(job_id: str, total_duration: float, offset: int = 0, share: float = 1.0):
+    """run_ffmpeg 진행 콜백: 인코딩 구간 진행률을 작업 전체의 offset ~ offset + share*100 구간으로 환산해 기록"""
+    # 진행률은 Redis 에만 기록하고 DB 는 roof_flush_progress 가 일괄 반영
+    publisher = ProgressPublisher(job_id)
+    stalled = False
+    speed_recorded = 0.0
+
+    def on_progress(snapshot: FfmpegProgress):
+        nonlocal stalled, speed_recorded
+        progress = offset + int((snapshot.out_seconds / total_duration) * 100 * share)
+        # 정체 시작/해소 시점은 간격과 관계없이 바로 기록
+        changed = snapshot.stalled != stalled
+        stalled = snapshot.stalled
+        if changed and stalled:
+            print(f"  [정체] {Settings.FFMPEG_STALL_SECONDS}초 이상 출력 시간이 늘지 않음 (Job: {job_id})", flush=True)
+        # 속도는 진행률 기록 간격과 별도로 만료 전에 갱신
+        now = time.monotonic()
+        if changed or now - speed_recorded >= SPEED_REFRESH_SECONDS:
+            record_speed(job_id, snapshot.speed)
+            speed_recorded = now
+        if publisher.update(progress, force=changed, worker=Settings.WORKER_NAME, **snapshot.to_dict()):
+            print(f"  [진행률] {min(progress, 100)}% fps={snapshot.fps} speed={snapshot.speed}x", flush=True)
+
+    return on_progress
+
+def encode_hls(s3_upload_video : Video, current_job: EncodingJob, db) -> tuple | None:
+    """인코딩 후 게시. 빠른 게시로 일부 화질만 게시한 경우 나머지 화질 작업 인자를 반환"""
+    print(f"--- [인코딩 시작] {s3_upload_video.filename}---", flush=True)
+    base_name = s3_upload_video.filename
+    work_dir = f"storage/tmp_{base_name.split('.')[0]}"
+    input_local = f"storage/{base_name}"
+    s3_prefix = f"encode/{base_name}"
+    uploader = None
+    backfill = None
+    dispatched = False
+
     try:
-        s3_service.download_file(Settings.UPLOAD_BUCKET_NAME, s3_upload_video.original_path, input_local)
+        source, media_info, transfers = resolve_input(s3_upload_video, input_local)
 
-        watch_state.incr(MASTER_COUNT_PREFIX)
+        if media_info is None:
+            raise ValueError("Could not probe source media.")
 
-        total_duration = _get_duration(input_local)
+        total_duration = media_info.duration
         if total_duration == 0:
             raise ValueError("Could not determine video duration.")
+        if not media_info.width or not media_info.height:
+            raise ValueError("Could not determine video resolution.")
+
+        complexity = get_complexity(s3_upload_video, source, total_duration)
+
+        # 원본보다 큰 화질은 만들지 않는 사다리 구성
+        ladder = build_ladder(
+            media_info.width, media_info.height, media_info.bit_rate,
+            complexity=complexity["factor"] if complexity else 1.0
+        )
+        plan = {
+            "ladder": ladder, "fps": media_info.fps, "has_audio": media_info.has_audio,
+            "audio_group": audio_group_bitrates() if media_info.has_audio and Settings.AUDIO_MODE == "group" else []
+        }
+        s3_upload_video.encoding_json = {
+            "source": media_info.to_dict(), "ladder": ladder, "complexity": complexity, "profile": profile_key(media_info)
+        }
+        _prepare_work_dir(work_dir, plan)
 
         current_job.status = JobStatus.ENCODING
         insert_or_update_job(current_job, db=db)
 
-        command = convert_default_hls_command(input_local, work_dir)
-        process = subprocess.Popen(command, stderr=subprocess.PIPE, stdout=subprocess.DEVNULL, text=True, encoding='utf-8')
+        chunked = _use_chunked_encode(total_duration)
+        if chunked or _use_rendition_encode(plan["ladder"]):
+            # 분배한 작업의 finalize/fail 이 먼저 커밋한 최종 상태를 덮어쓰지 않도록
+            # ENCODING 상태를 분배 전에 커밋하고, 분배 후에는 이 작업에서 저장하지 않음
+            insert_or_update_video(s3_upload_video, db=db)
+            db.commit()
+            if chunked:
+                # 청크 작업들이 끝나면 finalize_chunked_encode 에서 최종 상태를 기록
+                dispatch_chunked_encode(s3_upload_video, current_job, total_duration, plan)
+            else:
+                # 화질 묶음 작업들이 끝나면 finalize_rendition_encode 에서 최종 상태를 기록
+                dispatch_rendition_encode(s3_upload_video, current_job, plan)
+            dispatched = True
+            return
+
+        # 빠른 게시: 낮은 화질만 먼저 인코딩/게시하고 높은 화질은 보충 작업으로 추가
+        first_rungs, backfill_rungs = plan["ladder"], []
+        if _use_progressive_publish(total_duration):
+            first_rungs, backfill_rungs = split_ladder(plan["ladder"], Settings.FAST_FIRST_MAX_HEIGHT)
+        share = ladder_pixels(first_rungs) / ladder_pixels(plan["ladder"])
+
+        command = convert_default_hls_command(source, work_dir, {**plan, "ladder": first_rungs})
+        # 인코딩과 동시에 완성된 세그먼트를 업로드
+        uploader = _start_segment_uploader(work_dir, s3_prefix)
+
+        run_ffmpeg(command, _progress_reporter(current_job.id, total_duration, share=share))
+
+        if uploader:
+            transfers.append(uploader.finish())
+        publish_hls(s3_upload_video, current_job, work_dir, s3_prefix, transfers, final=not backfill_rungs)
+
+        if backfill_rungs and s3_upload_video.status == VideoStatus.READY:
+            # 영상은 재생 가능, 작업은 보충 인코딩이 끝날 때까지 진행 중
+            current_job.status = JobStatus.ENCODING
+            current_job.progress = int(share * 100)
+            s3_upload_video.encoding_json = {
+                **s3_upload_video.encoding_json, "pending_rungs": [rung["index"] for rung in backfill_rungs]
+            }
+            backfill = ({**_video_only(plan), "ladder": backfill_rungs}, total_duration, current_job.progress)
+            print(f"  [빠른 게시] {base_name} {[rung['h'] for rung in first_rungs]} 게시, 보충 예정 {[rung['h'] for rung in backfill_rungs]}", flush=True)
 
-        last_progress = -1
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, ValueError) as e:
+        current_job.status = JobStatus.FAILED
+        current_job.error_log = str(e)
+        s3_upload_video.status = VideoStatus.ENCODING_FAILED
+    except Exception as e:
+        current_job.status = JobStatus.FAILED
+        current_job.error_log = str(e)
+        s3_upload_video.status = VideoStatus.FAILED
+    finally:
+        # 플레이리스트가 게시되지 않은 경우 먼저 올라간 세그먼트 정리
+        if uploader and s3_upload_video.status != VideoStatus.READY:
+            uploader.discard()
+        if not dispatched:
+            insert_or_update_video(s3_upload_video, db=db)
+            insert_or_update_job(current_job, db=db)
+            if current_job.status != JobStatus.ENCODING:
+                clear_progress(current_job.id)
+        if os.path.exists(input_local): os.remove(input_local)
+        if os.path.exists(work_dir): shutil.rmtree(work_dir)
 
-        for line in process.stderr:
-            match = re.search(r"time=(\d{2}:\d{2}:\d{2}\.\d{2})", line)
-            if match:
-                current_time = _parse_time_to_seconds(match.group(1))
-                progress = int((current_time / total_duration) * 100)
-                if progress > last_progress:
-                    last_progress = progress
-                    update_job_progress(current_job.id, min(progress, 100))
-                    print(f"  [진행률] {min(progress, 100)}%", flush=True)
+    print(f"--- [인코딩 종료] 상태: {s3_upload_video.status.value}---", flush=True)
+    return backfill
 
-        process.wait()
-        master_path = f"{work_dir}/master.m3u8"
-        s3_prefix = f"encode/{base_name}"
+def _add_to_catalog(s3_upload_video : Video):
+    # 카탈로그 반영 실패가 게시된 영상의 상태를 바꾸지 않도록 분리
+    try:
+        add_to_catalog(s3_upload_video)
+    except Exception as e:
+        print(f"카탈로그 반영 에러: {e}", flush=True)
+
+def publish_hls(s3_upload_video : Video, current_job: EncodingJob, work_dir: str, s3_prefix: str, transfers: list[TransferStats] | None = None, final: bool = True):
+    encode_status = verify_encode(f"{work_dir}/master.m3u8")
+    transfers = list(transfers or [])
 
-        if process.returncode != 0:
-            raise subprocess.CalledProcessError(process.returncode, command, stderr=process.stderr.read())
+    if encode_status.get("is_valid") is True:
 
-        encode_status = verify_encode(master_path)
+        transfers.append(s3_service.upload_hls_folder(work_dir, Settings.HLS_BUCKET_NAME, s3_prefix))
 
-        if encode_status.get("is_valid") is True:
+        s3_upload_video.hls_path = s3_prefix
+        s3_upload_video.status = VideoStatus.READY
+        current_job.status = JobStatus.SUCCESS
+        current_job.progress = 100
+        _add_to_catalog(s3_upload_video)
+    else:
+        s3_upload_video.status = VideoStatus.VALIDATION_FAILED
+        current_job.status = JobStatus.FAILED
+        current_job.error_log = "Segment validation failed"
 
-            s3_service.upload_hls_folder(work_dir, Settings.HLS_BUCKET_NAME, s3_prefix)
+    # 전송 속도 튜닝용 통계
+    encode_status["transfers"] = [stats.to_dict() for stats in transfers]
+    s3_upload_video.encoding_json = {**(s3_upload_video.encoding_json or {}), **encode_status}
 
-            remaining_workers = watch_state.decr(MASTER_COUNT_PREFIX)
-            if remaining_workers == 0:
-                s3_service.update_master_file(Settings.HLS_BUCKET_NAME)
-                watch_state.delete(MASTER_COUNT_PREFIX)
-            elif remaining_workers < 0:
-                watch_state.delete(MASTER_COUNT_PREFIX)
+    # 같은 내용의 재업로드가 이 결과를 재사용할 수 있도록 인덱스 등록 (모든 화질이 게시된 경우만)
+    if final and s3_upload_video.status == VideoStatus.READY:
+        register_encoded(s3_upload_video)
 
+@celery_app.task(name="encode_hls_backfill_task")
+def encode_backfill(video_id: str, job_id: str, plan: dict, total_duration: float, progress_offset: int):
+    """빠른 게시 이후 나머지 높은 화질을 인코딩해 같은 경로에 올리고 마스터 플레이리스트에 추가"""
+    with reserve_slots(ladder_slots(plan["ladder"])):
+        with session_scope() as db:
+            s3_upload_video = select_entity(Video, video_id, db = db)
+            current_job = select_entity(EncodingJob, job_id, db = db)
+            base_name = s3_upload_video.filename
+            work_dir = f"storage/backfill_{base_name.split('.')[0]}"
+            input_local = f"storage/backfill_{base_name}"
+            s3_prefix = f"encode/{base_name}"
+            uploader = None
+
+            _prepare_work_dir(work_dir, plan)
+            print(f"--- [보충 인코딩 시작] {base_name} {[rung['h'] for rung in plan['ladder']]} ---", flush=True)
+
+            try:
+                source, _, transfers = resolve_input(s3_upload_video, input_local)
+                command = convert_default_hls_command(source, work_dir, plan)
+                uploader = _start_segment_uploader(work_dir, s3_prefix)
+
+                run_ffmpeg(command, _progress_reporter(job_id, total_duration, offset=progress_offset, share=1 - progress_offset / 100))
+
+                if uploader:
+                    transfers.append(uploader.finish())
+                publish_backfill(s3_upload_video, current_job, work_dir, s3_prefix, transfers)
+            except Exception as e:
+                # 이미 게시된 낮은 화질은 그대로 재생 가능
+                current_job.status = JobStatus.FAILED
+                current_job.error_log = f"Backfill failed: {e}"
+            finally:
+                if uploader and current_job.status != JobStatus.SUCCESS:
+                    uploader.discard()
+                insert_or_update_video(s3_upload_video, db=db)
+                insert_or_update_job(current_job, db=db)
+                clear_progress(job_id)
+                if os.path.exists(input_local): os.remove(input_local)
+                if os.path.exists(work_dir): shutil.rmtree(work_dir)
+
+    print(f"--- [보충 인코딩 종료] {base_name} 상태: {current_job.status.value}---", flush=True)
+
+def publish_backfill(s3_upload_video : Video, current_job: EncodingJob, work_dir: str, s3_prefix: str, transfers: list[TransferStats]):
+    master_path = f"{work_dir}/master.m3u8"
+    encode_status = verify_encode(master_path)
+    if encode_status.get("is_valid") is not True:
+        current_job.status = JobStatus.FAILED
+        current_job.error_log = "Backfill segment validation failed"
+        return
+
+    master_key = f"{s3_prefix}/master.m3u8"
+    provisional = s3_service.read_text(Settings.HLS_BUCKET_NAME, master_key)
+    if provisional is None:
+        raise ValueError(f"Provisional master playlist not found: {master_key}")
+
+    with open(master_path, encoding='utf-8') as f:
+        backfill_master = f.read()
+
+    # 화질별 플레이리스트를 먼저 올리고 마지막에 병합한 마스터로 교체
+    os.remove(master_path)
+    transfers.append(s3_service.upload_hls_folder(work_dir, Settings.HLS_BUCKET_NAME, s3_prefix))
+    with open(master_path, "w", encoding='utf-8') as f:
+        f.write(merge_master_playlists([provisional, backfill_master], audio_group_bandwidth(audio_group_bitrates())))
+    s3_service.upload_file(master_path, Settings.HLS_BUCKET_NAME, master_key)
+
+    previous = s3_upload_video.encoding_json or {}
+    variants = previous.get("variants", []) + encode_status["variants"]
+    s3_upload_video.encoding_json = {
+        **previous,
+        "variants": variants,
+        "total_variants": len(variants),
+        "pending_rungs": [],
+        "transfers": previous.get("transfers", []) + [stats.to_dict() for stats in transfers],
+    }
+    current_job.status = JobStatus.SUCCESS
+    current_job.progress = 100
+    register_encoded(s3_upload_video)
+
+@celery_app.task(name="copy_hls_task")
+def copy_encoded_hls(video_id: str, job_id: str, source_hls_path: str, source_video_id: str):
+    """중복 업로드: 기존 HLS 결과를 S3 서버 측 복사로 새 경로에 게시"""
+    with session_scope() as db:
+        s3_upload_video = select_entity(Video, video_id, db = db)
+        current_job = select_entity(EncodingJob, job_id, db = db)
+        s3_prefix = f"encode/{s3_upload_video.filename}"
+
+        try:
+            stats = s3_service.copy_prefix(Settings.HLS_BUCKET_NAME, source_hls_path, s3_prefix)
             s3_upload_video.hls_path = s3_prefix
             s3_upload_video.status = VideoStatus.READY
+            s3_upload_video.encoding_json = {
+                **(s3_upload_video.encoding_json or {}), "dedupe_of": source_video_id, "transfers": [stats.to_dict()]
+            }
             current_job.status = JobStatus.SUCCESS
             current_job.progress = 100
-        else:
-            s3_upload_video.status = VideoStatus.VALIDATION_FAILED
+            _add_to_catalog(s3_upload_video)
+        except Exception as e:
             current_job.status = JobStatus.FAILED
-            current_job.error_log = "Segment validation failed"
+            current_job.error_log = str(e)
+            s3_upload_video.status = VideoStatus.FAILED
+        finally:
+            insert_or_update_video(s3_upload_video, db=db)
+            insert_or_update_job(current_job, db=db)
+
+    # 새 인코딩과 같이 게시된 결과를 인덱스에 등록 (커밋 이후)
+    if s3_upload_video.status == VideoStatus.READY:
+        register_encoded(s3_upload_video)
+
+    print(f"--- [중복 복사 종료] {s3_upload_video.filename} 상태: {s3_upload_video.status.value}---", flush=True)
+
+def _use_chunked_encode(total_duration: float) -> bool:
+    return Settings.CHUNKED_ENCODE and total_duration >= Settings.CHUNK_MIN_DURATION
+
+def profile_key(media_info: MediaInfo) -> str:
+    """원본에 실제로 적용될 분배/게시 방식(encode_hls 와 같은 판단) 을 반영한 인코딩 프로파일 키"""
+    # 화질 구성만 판단에 쓰이므로 복잡도 배율 없이 사다리 구성
+    ladder = build_ladder(media_info.width, media_info.height, media_info.bit_rate)
+    chunked = _use_chunked_encode(media_info.duration)
+    return encoding_profile_key(
+        chunked=chunked,
+        renditions=not chunked and _use_rendition_encode(ladder),
+        progressive=_use_progressive_publish(media_info.duration)
+            and bool(split_ladder(ladder, Settings.FAST_FIRST_MAX_HEIGHT)[1]),
+    )
+
+def split_chunks(total_duration: float) -> list[tuple[float, float | None]]:
+    # 청크 경계를 세그먼트 길이(-force_key_frames 2초)의 배수로 맞춰 키프레임 위치를 보존
+    chunk_seconds = max(1, math.ceil(Settings.CHUNK_SECONDS / HLS_SEGMENT_SECONDS)) * HLS_SEGMENT_SECONDS
+    chunks = []
+    start = 0
+    while start < total_duration:
+        # 마지막 청크는 길이를 지정하지 않고 파일 끝까지 인코딩
+        duration = chunk_seconds if start + chunk_seconds < total_duration else None
+        chunks.append((start, duration))
+        start += chunk_seconds
+    return chunks
+
+def dispatch_chunked_encode(s3_upload_video : Video, current_job: EncodingJob, total_duration: float, plan: dict):
+    video_id, job_id = str(s3_upload_video.id), str(current_job.id)
+    chunks = split_chunks(total_duration)
+    watch_state.delete(f"{CHUNK_DONE_PREFIX}{job_id}")
+
+    header = [
+        encode_chunk.s(video_id, job_id, idx, start, duration, len(chunks), plan)
+        for idx, (start, duration) in enumerate(chunks)
+    ]
+    callback = finalize_chunked_encode.s(video_id, job_id).on_error(fail_chunked_encode.s(video_id, job_id))
+    chord(header)(callback)
+    print(f"--- [청크 분배] {s3_upload_video.filename} {len(chunks)}개 청크 ---", flush=True)
 
-        s3_upload_video.encoding_json = encode_status
+def _encode_part(s3_upload_video : Video, job_id: str, work_dir: str, plan: dict, start: float | None = None, duration: float | None = None, segment_prefix: str = "") -> tuple[str, dict]:
+    """청크/화질 묶음 단위 인코딩: 세그먼트만 업로드하고 마스터/화질별 플레이리스트 내용은 반환 (게시는 chord 콜백에서)"""
+    base_name = s3_upload_video.filename
+    s3_prefix = f"encode/{base_name}"
+    # 작업 디렉터리를 통째로 업로드할 수 있도록 원본은 밖에 저장
+    input_local = f"{work_dir}_{base_name}"
+    uploader = None
+
+    _prepare_work_dir(work_dir, plan)
+
+    try:
+        # 스트리밍 입력이면 -ss 탐색이 Range 요청으로 처리되어 청크 구간만 읽음
+        source, _, _ = resolve_input(s3_upload_video, input_local)
+
+        command = convert_default_hls_command(
+            source, work_dir, plan, start=start, duration=duration, segment_prefix=segment_prefix
+        )
+        # 세그먼트만 먼저 업로드하고 플레이리스트는 finalize 단계에서 병합 후 게시
+        uploader = _start_segment_uploader(work_dir, s3_prefix)
+        run_ffmpeg(command)
+
+        # 다른 청크/화질 묶음이 먼저 실패해 정리된 작업이면 올린 세그먼트를 지우고 종료
+        if watch_state.exists(f"{PART_FAILED_PREFIX}{job_id}"):
+            raise RuntimeError("Parallel encode already failed")
+
+        if uploader:
+            uploader.finish()
+        else:
+            s3_service.upload_hls_folder(work_dir, Settings.HLS_BUCKET_NAME, s3_prefix, extensions=(FMP4_MEDIA_EXTENSION,))
+
+        with open(f"{work_dir}/master.m3u8", encoding='utf-8') as f:
+            master = f.read()
+
+        variants = {}
+        for entry in sorted(os.listdir(work_dir)):
+            index_path = os.path.join(work_dir, entry, "index.m3u8")
+            if os.path.exists(index_path):
+                with open(index_path, encoding='utf-8') as f:
+                    variants[entry] = f.read()
+        return master, variants
+    except Exception:
+        if uploader:
+            uploader.discard()
+        raise
+    finally:
+        if os.path.exists(input_local): os.remove(input_local)
+        if os.path.exists(work_dir): shutil.rmtree(work_dir)
+
+@celery_app.task(name="encode_hls_chunk_task")
+def encode_chunk(video_id: str, job_id: str, chunk_index: int, start: float, duration: float | None, total_chunks: int, plan: dict):
+    with reserve_slots(ladder_slots(plan["ladder"])):
+        with session_scope() as db:
+            s3_upload_video = select_entity(Video, video_id, db = db)
+
+        base_name = s3_upload_video.filename
+        # 청크별 세그먼트 이름이 겹치지 않도록 청크 번호를 접두어로 사용
+        master, variants = _encode_part(
+            s3_upload_video, job_id, f"storage/chunk_{base_name.split('.')[0]}_{chunk_index}", plan,
+            start=start, duration=duration, segment_prefix=f"{chunk_index:05d}_"
+        )
+
+    done = watch_state.incr(f"{CHUNK_DONE_PREFIX}{job_id}")
+    publish_progress(job_id, min(int(done * 100 / total_chunks), 99))
+    print(f"  [청크 완료] {base_name} {done}/{total_chunks}", flush=True)
+
+    return {"chunk": chunk_index, "master": master, "variants": variants}
+
+def _use_rendition_encode(ladder: list[dict]) -> bool:
+    return Settings.ENCODE_MODE == "renditions" and len(ladder) > 1
+
+def rendition_groups(ladder: list[dict]) -> list[list[dict]]:
+    """RENDITION_GROUPS("0,1;2;3;4", 사다리 단계 번호) 기준으로 화질 묶음 구성. 지정되지 않은 단계는 각각 한 묶음"""
+    by_index = {rung["index"]: rung for rung in ladder}
+    groups = []
+    for spec in Settings.RENDITION_GROUPS.split(";"):
+        group = [by_index.pop(int(index)) for index in spec.split(",") if index.strip() and int(index) in by_index]
+        if group:
+            groups.append(group)
+    groups += [[rung] for rung in by_index.values()]
+    return groups
+
+def dispatch_rendition_encode(s3_upload_video : Video, current_job: EncodingJob, plan: dict):
+    video_id, job_id = str(s3_upload_video.id), str(current_job.id)
+    groups = rendition_groups(plan["ladder"])
+    watch_state.delete(f"{RENDITION_DONE_PREFIX}{job_id}")
+
+    # 화질 묶음마다 별도 작업으로 어느 워커에서나 실행, 모두 끝나면 마스터 병합 후 검증/게시
+    header = [
+        encode_rendition_group.s(video_id, job_id, idx, {**(plan if idx == 0 else _video_only(plan)), "ladder": group}, len(groups))
+        for idx, group in enumerate(groups)
+    ]
+    callback = finalize_rendition_encode.s(video_id, job_id).on_error(fail_chunked_encode.s(video_id, job_id))
+    chord(header)(callback)
+    print(f"--- [화질 분배] {s3_upload_video.filename} {[[rung['h'] for rung in group] for group in groups]} ---", flush=True)
+
+@celery_app.task(name="encode_hls_rendition_task")
+def encode_rendition_group(video_id: str, job_id: str, group_index: int, plan: dict, total_groups: int):
+    with reserve_slots(ladder_slots(plan["ladder"])):
+        with session_scope() as db:
+            s3_upload_video = select_entity(Video, video_id, db = db)
+
+        base_name = s3_upload_video.filename
+        master, variants = _encode_part(s3_upload_video, job_id, f"storage/rendition_{base_name.split('.')[0]}_{group_index}", plan)
+
+    done = watch_state.incr(f"{RENDITION_DONE_PREFIX}{job_id}")
+    publish_progress(job_id, min(int(done * 100 / total_groups), 99))
+    print(f"  [화질 완료] {base_name} {[rung['h'] for rung in plan['ladder']]} {done}/{total_groups}", flush=True)
+
+    return {"group": group_index, "master": master, "variants": variants}
+
+@celery_app.task(name="finalize_rendition_encode_task")
+def finalize_rendition_encode(group_results: list[dict], video_id: str, job_id: str):
+    with session_scope() as db:
+        s3_upload_video = select_entity(Video, video_id, db = db)
+        current_job = select_entity(EncodingJob, job_id, db = db)
+        base_name = s3_upload_video.filename
+        work_dir = f"storage/tmp_{base_name.split('.')[0]}"
+        os.makedirs(work_dir, exist_ok=True)
+
+        try:
+            with open(f"{work_dir}/master.m3u8", "w", encoding='utf-8') as f:
+                f.write(merge_master_playlists(
+                    [result["master"] for result in group_results], audio_group_bandwidth(audio_group_bitrates())
+                ))
+
+            for result in group_results:
+                for variant, content in result["variants"].items():
+                    os.makedirs(os.path.join(work_dir, variant), exist_ok=True)
+                    with open(os.path.join(work_dir, variant, "index.m3u8"), "w", encoding='utf-8') as f:
+                        f.write(content)
+
+            publish_hls(s3_upload_video, current_job, work_dir, f"encode/{base_name}")
+        except Exception as e:
+            current_job.status = JobStatus.FAILED
+            current_job.error_log = str(e)
+            s3_upload_video.status = VideoStatus.FAILED
+        finally:
+            insert_or_update_video(s3_upload_video, db=db)
+            insert_or_update_job(current_job, db=db)
+            clear_progress(job_id)
+            watch_state.delete(f"{RENDITION_DONE_PREFIX}{job_id}")
+            if os.path.exists(work_dir): shutil.rmtree(work_dir)
+
+    print(f"--- [화질 병합 종료] 상태: {s3_upload_video.status.value}---", flush=True)
+
+def stitch_variant_playlists(playlists: list[str]) -> str:
+    """청크별 화질 플레이리스트를 순서대로 이어 붙임 (fMP4 는 청크마다 EXT-X-MAP/BYTERANGE 유지)
+
+    청크는 서로 독립된 인코딩이라 경계에서 인코더 상태와 AAC 프라이밍 샘플이 다시 시작되므로
+    두 번째 청크부터 첫 세그먼트 앞에 EXT-X-DISCONTINUITY 를 넣어 플레이어가 디코더를 다시 맞추도록 합니다.
+    """
+    segments = []
+    for chunk_index, content in enumerate(playlists):
+        for seg_index, seg in enumerate(m3u8.loads(content).segments):
+            init = seg.init_section
+            segments.append((
+                seg.duration, seg.uri, seg.byterange,
+                (init.uri, init.byterange) if init else None,
+                chunk_index > 0 and seg_index == 0
+            ))
+    byte_ranged = any(byterange or init for _, _, byterange, init, _ in segments)
+
+    lines = [
+        "#EXTM3U",
+        f"#EXT-X-VERSION:{7 if byte_ranged else 3}",
+        f"#EXT-X-TARGETDURATION:{math.ceil(max(duration for duration, *_ in segments))}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+    ]
+    current_init = None
+    for duration, uri, byterange, init, discontinuity in segments:
+        if discontinuity:
+            lines.append("#EXT-X-DISCONTINUITY")
+        if init and init != current_init:
+            init_uri, init_range = init
+            lines.append(f'#EXT-X-MAP:URI="{init_uri}"' + (f',BYTERANGE="{init_range}"' if init_range else ""))
+            current_init = init
+        lines.append(f"#EXTINF:{duration:.6f},")
+        if byterange:
+            lines.append(f"#EXT-X-BYTERANGE:{byterange}")
+        lines.append(uri)
+    lines.append("#EXT-X-ENDLIST")
+    return "\n".join(lines) + "\n"
+
+@celery_app.task(name="finalize_chunked_encode_task")
+def finalize_chunked_encode(chunk_results: list[dict], video_id: str, job_id: str):
+    chunk_results = sorted(chunk_results, key=lambda r: r["chunk"])
+
+    with session_scope() as db:
+        s3_upload_video = select_entity(Video, video_id, db = db)
+        current_job = select_entity(EncodingJob, job_id, db = db)
+        base_name = s3_upload_video.filename
+        work_dir = f"storage/tmp_{base_name.split('.')[0]}"
+        os.makedirs(work_dir, exist_ok=True)
+
+        try:
+            with open(f"{work_dir}/master.m3u8", "w", encoding='utf-8') as f:
+                f.write(chunk_results[0]["master"])
+
+            for variant in chunk_results[0]["variants"]:
+                os.makedirs(os.path.join(work_dir, variant), exist_ok=True)
+                with open(os.path.join(work_dir, variant, "index.m3u8"), "w", encoding='utf-8') as f:
+                    f.write(stitch_variant_playlists([r["variants"][variant] for r in chunk_results]))
+
+            publish_hls(s3_upload_video, current_job, work_dir, f"encode/{base_name}")
+        except Exception as e:
+            current_job.status = JobStatus.FAILED
+            current_job.error_log = str(e)
+            s3_upload_video.status = VideoStatus.FAILED
+        finally:
+            insert_or_update_video(s3_upload_video, db=db)
+            insert_or_update_job(current_job, db=db)
+            clear_progress(job_id)
+            watch_state.delete(f"{CHUNK_DONE_PREFIX}{job_id}")
+            if os.path.exists(work_dir): shutil.rmtree(work_dir)
+
+    print(f"--- [청크 병합 종료] 상태: {s3_upload_video.status.value}---", flush=True)
+
+@celery_app.task(name="fail_chunked_encode_task")
+def fail_chunked_encode(request, exc, traceback, video_id: str, job_id: str):
+    with session_scope() as db:
+        s3_upload_video = select_entity(Video, video_id, db = db)
+        current_job = select_entity(EncodingJob, job_id, db = db)
 
-    except (subprocess.CalledProcessError, ValueError) as e:
         current_job.status = JobStatus.FAILED
-        current_job.error_log = str(e)
+        current_job.error_log = f"Parallel encode failed: {exc}"
         s3_upload_video.status = VideoStatus.ENCODING_FAILED
-    except Exception as e:
-        current_job.status = JobStatus.FAILED
-        current_job.error_log = str(e)
-        s3_upload_video.status = VideoStatus.FAILED
-    finally:
+
         insert_or_update_video(s3_upload_video, db=db)
         insert_or_update_job(current_job, db=db)
-        if os.path.exists(input_local): os.remove(input_local)
-        if os.path.exists(work_dir): shutil.rmtree(work_dir)
 
-    print(f"--- [인코딩 종료] 상태: {s3_upload_video.status.value}---", flush=True)
+    clear_progress(job_id)
+    watch_state.delete(f"{CHUNK_DONE_PREFIX}{job_id}", f"{RENDITION_DONE_PREFIX}{job_id}")
+
+    # 끝났거나 아직 업로드 중인 청크/화질 묶음의 세그먼트 정리 (단일 작업의 HlsStreamUploader.discard 와 같은 역할)
+    # 이전에 같은 이름으로 게시된 결과는 남도록 이 작업 시작 이후에 쓰인 객체만 삭제
+    watch_state.set(f"{PART_FAILED_PREFIX}{job_id}", 1, ex=PART_FAILED_TTL_SECONDS)
+    try:
+        deleted = s3_service.delete_prefix(
+            Settings.HLS_BUCKET_NAME, f"encode/{s3_upload_video.filename}",
+            modified_since=current_job.started_at - CLEANUP_CLOCK_MARGIN if current_job.started_at else None
+        )
+        print(f"  [업로드 정리] {s3_upload_video.filename} 세그먼트 {deleted}개 삭제", flush=True)
+    except Exception as e:
+        print(f"업로드 세그먼트 정리 실패: {e}", flush=True)
+
+def _verify_media_playlist(base_dir: str, uri: str) -> dict:
+    sub_path = os.path.join(base_dir, uri)
+    if not os.path.exists(sub_path):
+        return {"uri": uri, "is_valid": False, "error": "File missing"}
+
+    sub_pl = m3u8.load(sub_path)
+
+    has_segments = len(sub_pl.segments) > 0
+    durations_valid = all(seg.duration <= (sub_pl.target_duration + 1.5) for seg in sub_pl.segments)
+    ranges_valid = _verify_byte_ranges(os.path.dirname(sub_path), sub_pl)
+
+    return {
+        "uri": uri,
+        "is_end_list": sub_pl.is_endlist,
+        "target_duration": sub_pl.target_duration,
+        "segments_count": len(sub_pl.segments),
+        "is_valid": has_segments and durations_valid and ranges_valid
+    }
+
+def _parse_byterange(byterange: str, next_offset: int) -> tuple[int, int]:
+    # "길이@오프셋", 오프셋이 없으면 같은 파일의 직전 범위 끝부터
+    length, _, offset = byterange.partition("@")
+    return int(length), int(offset) if offset else next_offset
+
+def _verify_byte_ranges(base_dir: str, playlist) -> bool:
+    """단일 파일(fMP4) 플레이리스트: 파일별 범위가 초기화 구간부터 겹치거나 빈 곳 없이 이어지고 파일 크기를 넘지 않는지 확인
+
+    청크/화질 분배 모드처럼 미디어 파일이 이미 업로드되어 로컬에 없으면 연속성만 확인합니다.
+    """
+    if not any(seg.byterange for seg in playlist.segments):
+        return True
+
+    ends: dict[str, int] = {}
+    for seg in playlist.segments:
+        init = seg.init_section
+        if init and init.byterange and init.uri not in ends:
+            length, offset = _parse_byterange(init.byterange, 0)
+            if offset != 0:
+                return False
+            ends[init.uri] = length
+        if not seg.byterange:
+            return False
+        expected = ends.get(seg.uri)
+        length, offset = _parse_byterange(seg.byterange, expected or 0)
+        if length <= 0 or (expected is not None and offset != expected):
+            return False
+        ends[seg.uri] = offset + length
+
+    for uri, end in ends.items():
+        media_path = os.path.join(base_dir, uri)
+        if os.path.exists(media_path) and os.path.getsize(media_path) < end:
+            return False
+    return True
 
 def verify_encode(local_master_path: str):
     if not os.path.exists(local_master_path):
@@ -151,27 +819,14 @@ def verify_encode(local_master_path: str):
         if not master_playlist.playlists:
             return {"is_valid": False, "error": "No variant playlists found in master"}
 
+        base_dir = os.path.dirname(local_master_path)
         for playlist_ref in master_playlist.playlists:
-            base_dir = os.path.dirname(local_master_path)
-            sub_path = os.path.join(base_dir, playlist_ref.uri)
-
-            if not os.path.exists(sub_path):
-                all_results.append({"uri": playlist_ref.uri, "is_valid": False, "error": "File missing"})
-                continue
+            all_results.append(_verify_media_playlist(base_dir, playlist_ref.uri))
 
-            sub_pl = m3u8.load(sub_path)
-
-            has_segments = len(sub_pl.segments) > 0
-            durations_valid = all(seg.duration <= (sub_pl.target_duration + 1.5) for seg in sub_pl.segments)
-
-            res_valid = {
-                "uri": playlist_ref.uri,
-                "is_end_list": sub_pl.is_endlist,
-                "target_duration": sub_pl.target_duration,
-                "segments_count": len(sub_pl.segments),
-                "is_valid": has_segments and durations_valid
-            }
-            all_results.append(res_valid)
+        # 오디오 그룹 등 EXT-X-MEDIA 로 참조하는 플레이리스트도 같은 기준으로 검증
+        for media in master_playlist.media:
+            if media.uri:
+                all_results.append({**_verify_media_playlist(base_dir, media.uri), "type": media.type})
 
         is_all_valid = len(all_results) > 0 and \
                        all(r.get("is_valid") for r in all_results) and \
@@ -186,73 +841,88 @@ def verify_encode(local_master_path: str):
     except Exception as e:
         return {"is_valid": False, "error": str(e)}
 
-def _has_audio(file_path: str) -> bool:
-    command = [
-        "ffprobe", "-v", "error", "-select_streams", "a",
-        "-show_entries", "stream=index", "-of", "csv=p=0", file_path
-    ]
-    try:
-        result = subprocess.run(command, capture_output=True, text=True)
-        return bool(result.stdout.strip())
-    except Exception:
-        return False
-
-def convert_default_hls_command(local_from :str, local_to : str):
-
-    has_audio = _has_audio(local_from)
-
-    configs = [
-        {"w": 640,  "h": 360,  "v_bit": "800k",  "a_bit": "96k", "buf": "1600k"},
-        {"w": 1280, "h": 720,  "v_bit": "2800k", "a_bit": "128k", "buf": "5600k"},
-        {"w": 1920, "h": 1080, "v_bit": "5000k", "a_bit": "192k", "buf": "10000k"},
-        {"w": 2560, "h": 1440, "v_bit": "10000k", "a_bit": "192k", "buf": "20000k"},
-        {"w": 3840, "h": 2160, "v_bit": "20000k", "a_bit": "256k", "buf": "40000k"},
-        # {"w": 7680, "h": 4320, "v_bit": "50000k", "a_bit": "320k", "buf": "80000k"}
-    ]
-
-    command = ["ffmpeg", "-benchmark", "-y", "-i", local_from]
+def convert_default_hls_command(local_from :str, local_to : str, plan: dict, start: float | None = None, duration: float | None = None, segment_prefix: str = ""):
+
+    has_audio = plan["has_audio"]
+    # 오디오 그룹 모드: 오디오는 화질 수와 관계없이 audio_group 개수만큼만 인코딩하고 각 화질이 EXT-X-MEDIA 그룹 참조
+    audio_group = plan.get("audio_group") or []
+    # 세그먼트 길이마다 키프레임이 오도록 원본 프레임레이트 기준 GOP 설정
+    gop = str(max(1, round((plan.get("fps") or 30) * HLS_SEGMENT_SECONDS)))
+
+    command = ["ffmpeg", "-benchmark", "-y"]
+    if start:
+        command += ["-ss", str(start)]
+    command += [*input_options(local_from), "-i", local_from]
+    if duration:
+        command += ["-t", str(duration)]
+    if start:
+        # 청크 간 타임스탬프가 이어지도록 원본 위치만큼 출력 시간 보정
+        command += ["-output_ts_offset", str(start)]
     var_map = []
 
-    for idx, conf in enumerate(configs):
+    for idx, conf in enumerate(plan["ladder"]):
         command += [
             "-map", "0:v:0",
             f"-c:v:{idx}", "libx264",
-            f"-s:{idx}", f"{conf['w']}x{conf['h']}",
+            f"-s:v:{idx}", f"{conf['w']}x{conf['h']}",
             f"-b:v:{idx}", conf['v_bit'],
             f"-maxrate:v:{idx}", conf['v_bit'],
             f"-bufsize:v:{idx}", conf['buf']
         ]
 
         # 오디오가 있을 때만 매핑 추가
-        if has_audio:
+        if has_audio and audio_group:
+            var_map.append(f"v:{idx},agroup:{AUDIO_GROUP_ID},name:{rung_name(conf)}")
+        elif has_audio:
             command += [
                 "-map", "0:a:0",
                 f"-c:a:{idx}", "aac",
                 f"-b:a:{idx}", conf['a_bit']
             ]
-            var_map.append(f"v:{idx},a:{idx}")
+            var_map.append(f"v:{idx},a:{idx},name:{rung_name(conf)}")
         else:
-            var_map.append(f"v:{idx}")
+            var_map.append(f"v:{idx},name:{rung_name(conf)}")
+
+    if has_audio:
+        for idx, bitrate in enumerate(audio_group):
+            command += [
+                "-map", "0:a:0",
+                f"-c:a:{idx}", "aac",
+                f"-b:a:{idx}", bitrate
+            ]
+            default = ",default:yes" if idx == 0 else ""
+            var_map.append(f"a:{idx},agroup:{AUDIO_GROUP_ID},name:{audio_rendition_name(idx)}{default}")
 
     command += [
         "-preset", "ultrafast",
-        "-g", "60", "-sc_threshold", "0",
-        "-keyint_min", "60",
-        "-force_key_frames", "expr:gte(t,n_forced*2)",
+        "-g", gop, "-sc_threshold", "0",
+        "-keyint_min", gop,
+        "-force_key_frames", f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
         "-f", "hls",
-        "-hls_time", "2",
+        "-hls_time", str(HLS_SEGMENT_SECONDS),
         "-hls_list_size", "0",
         "-hls_playlist_type", "vod",
-        "-hls_flags", "independent_segments",
         "-master_pl_name", "master.m3u8",
         "-var_stream_map", " ".join(var_map), # 공백으로 구분된 문자열 하나로 전달
-        "-hls_segment_filename", f"{local_to}/%v/%d.ts",
-        f"{local_to}/%v/index.m3u8" # 마지막 출력 경로
     ]
+    if Settings.SEGMENT_FORMAT == "fmp4":
+        # 화질마다 미디어 파일 1개, 플레이리스트는 EXT-X-MAP/EXT-X-BYTERANGE 로 구간 참조
+        command += [
+            "-hls_segment_type", "fmp4",
+            "-hls_flags", "independent_segments+single_file",
+            "-hls_segment_filename", f"{local_to}/%v/{segment_prefix}media{FMP4_MEDIA_EXTENSION}",
+        ]
+    else:
+        command += [
+            "-hls_flags", "independent_segments",
+            "-hls_segment_filename", f"{local_to}/%v/{segment_prefix}%d.ts",
+        ]
+    command.append(f"{local_to}/%v/index.m3u8") # 마지막 출력 경로
     return command
 
-def get_worker_status(cpu, memory):
-    if cpu > 90 or memory > 90:
+def get_worker_status(sample: ResourceSample):
+    cpu, memory = sample.cpu, sample.memory
+    if cpu > 90 or memory > 90 or sample.scratch_free_gb < Settings.SCRATCH_MIN_FREE_GB:
         return WorkerStatus.OVERLOAD
     elif cpu > 70:
         return WorkerStatus.BUSY
@@ -261,72 +931,61 @@ def get_worker_status(cpu, memory):
     else:
         return WorkerStatus.IDLE
 
-def get_resource():
+def update_status(worker_id: str, sample: ResourceSample):
+    """하트비트: Redis 상태 해시/부하 점수/지표 버퍼만 갱신 (DB 는 roof_flush_metrics 가 일괄 적재)"""
     try:
-        main_process = psutil.Process(os.getpid())
-        children = main_process.children(recursive=True)
-
-        total_cpu = main_process.cpu_percent(interval=1)
-        for child in children:
-            try:
-                total_cpu += child.cpu_percent(interval=1)
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-
-        total_mem = main_process.memory_percent()
-        for child in children:
-            try:
-                total_mem += child.memory_percent()
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                continue
-
-        core_count = 1 if 1 > psutil.cpu_count() else psutil.cpu_count()
-
-        normalized_cpu = total_cpu / core_count
-
-        return normalized_cpu, total_mem
-    except Exception as e:
-        print(f"자원 측정 에러: {e}")
-        return 0.0, 0.0
-
-def update_status(worker, db):
-    try:
-        cpu, memory = get_resource()
-        status_enum = get_worker_status(cpu, memory)
-
-        worker.cpu_usage = cpu
-        worker.memory_usage = memory
-        worker.status = status_enum
-
-        saved_worker = insert_or_update_worker(worker, db=db)
-        current_worker_id = saved_worker.id
-
+        cpu, memory = sample.cpu, sample.memory
+        status_enum = get_worker_status(sample)
         status_str = status_enum.value if hasattr(status_enum, 'value') else str(status_enum)
 
+        # 살아 있는 작업의 슬롯 임대 연장, 비정상 종료된 작업의 슬롯 회수
+        refresh_leases()
+        reclaim_expired_leases()
+
         redis_data = {
-            'cpu': cpu,
-            'memory': memory,
-            'id': str(current_worker_id) if current_worker_id else "",
-            'status': status_str
+            **sample.to_dict(),
+            'id': worker_id,
+            'status': status_str,
+            'slots': worker_capacity(),
+            'free_slots': free_slots(),
+            'realtime_factor': realtime_factor()
         }
-        watch_state.hset(f"status:{Settings.WORKER_NAME}", mapping=redis_data)
-        watch_state.expire(f"status:{Settings.WORKER_NAME}", 10)
+        pipe = watch_state.pipeline()
+        pipe.hset(f"status:{Settings.WORKER_NAME}", mapping=redis_data)
+        pipe.expire(f"status:{Settings.WORKER_NAME}", 10)
+        buffer_sample(pipe, Settings.WORKER_NAME, sample, status_str)
+        publish_event("worker", {
+            "id": worker_id, "hostname": Settings.WORKER_NAME, "status": status_str,
+            "cpu_usage": int(cpu), "memory_usage": int(memory), "last_heartbeat": datetime.now(timezone.utc),
+            "free_slots": redis_data["free_slots"], "realtime_factor": redis_data["realtime_factor"]
+        }, pipe)
+        pipe.execute()
+        update_load(Settings.WORKER_NAME, (cpu + memory) / 2, status_enum == WorkerStatus.OVERLOAD)
 
     except Exception as e:
         import traceback
         print(f"상태 에러 상세:\n{traceback.format_exc()}", flush=True)
 
 
-def roof_update_status():
+def roof_update_status(worker_id: str):
+    sampler = ResourceSampler()
+    interval = Settings.HEARTBEAT_INTERVAL
+    next_beat = time.monotonic()
     while True:
-        worker = Worker(
-            hostname=Settings.WORKER_NAME,
-        )
-        with session_scope() as db:
-            update_status(worker, db)
-        time.sleep(3)
+        # 측정/저장 소요 시간과 관계없이 고정 주기로 하트비트
+        next_beat += interval
+        update_status(worker_id, sampler.sample())
+        time.sleep(max(0.0, next_beat - time.monotonic()))
+        if time.monotonic() - next_beat > interval:
+            next_beat = time.monotonic()
 
 
 @worker_ready.connect
 def start_check_thread(**kwargs):
-    threading.Thread(target=roof_update_status, daemon=True).start()
+    init_slots()
+    with session_scope() as db:
+        worker_id = register_worker(Worker(hostname=Settings.WORKER_NAME), db)
+    threading.Thread(target=roof_update_status, args=(worker_id,), daemon=True).start()
+    threading.Thread(target=roof_flush_metrics, args=(Settings.WORKER_NAME,), daemon=True).start()
+    threading.Thread(target=roof_flush_progress, daemon=True).start()
+    threading.Thread(target=rebuild_catalog, daemon=True).start()
@@ -1,3 +1,6 @@
 #!/bin/bash
 awslocal s3 mb s3://upload-bucket
-awslocal s3 mb s3://hls-bucket
\ No newline at end of file
+awslocal s3 mb s3://hls-bucket
+awslocal sqs create-queue --queue-name upload-events
+awslocal s3api put-bucket-notification-configuration --bucket upload-bucket \
+  --notification-configuration '{"QueueConfigurations":[{"QueueArn":"arn:aws:sqs:us-east-1:000000000000:upload-events","Events":["s3:ObjectCreated:*"]}]}'
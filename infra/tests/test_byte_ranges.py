@@ -0,0 +1,41 @@
+import m3u8
+
+from app.worker.tasks import _verify_byte_ranges
+
+
+def _playlist(ranges: list[str], init: str | None = '800@0') -> m3u8.M3U8:
+    lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-TARGETDURATION:2"]
+    if init:
+        lines.append(f'#EXT-X-MAP:URI="stream.mp4",BYTERANGE="{init}"')
+    for byterange in ranges:
+        lines += ["#EXTINF:2.000000,", f"#EXT-X-BYTERANGE:{byterange}", "stream.mp4"]
+    return m3u8.loads("\n".join(lines + ["#EXT-X-ENDLIST"]) + "\n")
+
+def _write_media(path, size: int):
+    (path / "stream.mp4").write_bytes(b"\0" * size)
+
+
+def test_contiguous_ranges_within_file(tmp_path):
+    _write_media(tmp_path, 3000)
+    assert _verify_byte_ranges(str(tmp_path), _playlist(["1000@800", "1200"]))
+
+def test_ranges_past_end_of_file(tmp_path):
+    _write_media(tmp_path, 2500)
+    assert not _verify_byte_ranges(str(tmp_path), _playlist(["1000@800", "1200@1800"]))
+
+def test_gap_between_ranges(tmp_path):
+    assert not _verify_byte_ranges(str(tmp_path), _playlist(["1000@800", "1200@1900"]))
+
+def test_overlap_with_init_section(tmp_path):
+    assert not _verify_byte_ranges(str(tmp_path), _playlist(["1000@700"]))
+
+def test_init_section_must_start_at_zero(tmp_path):
+    assert not _verify_byte_ranges(str(tmp_path), _playlist(["1000@900"], init="800@100"))
+
+def test_missing_media_checks_continuity_only(tmp_path):
+    # 이미 업로드되어 로컬 파일이 없는 경우
+    assert _verify_byte_ranges(str(tmp_path), _playlist(["1000@800", "1200@1800"]))
+
+def test_segment_files_are_skipped(tmp_path):
+    playlist = m3u8.loads("#EXTM3U\n#EXT-X-TARGETDURATION:2\n#EXTINF:2.0,\n0.ts\n#EXT-X-ENDLIST\n")
+    assert _verify_byte_ranges(str(tmp_path), playlist)
@@ -0,0 +1,37 @@
+import base64, uuid
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import Video, Worker
+from app.manager.api.endpoints import encode_cursor, decode_cursor
+
+VIDEO_ORDER = [Video.created_at, Video.id]
+
+
+def test_cursor_round_trip_datetime_and_uuid():
+    row = SimpleNamespace(created_at=datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc), id=uuid.uuid4())
+    cursor = encode_cursor(row, VIDEO_ORDER)
+    assert decode_cursor(cursor, VIDEO_ORDER) == (row.created_at, row.id)
+
+def test_cursor_round_trip_string():
+    row = SimpleNamespace(hostname="worker-01")
+    assert decode_cursor(encode_cursor(row, [Worker.hostname]), [Worker.hostname]) == ("worker-01",)
+
+def test_cursor_is_url_safe():
+    row = SimpleNamespace(hostname="?>?>?>~~~")
+    cursor = encode_cursor(row, [Worker.hostname])
+    assert "+" not in cursor and "/" not in cursor
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    base64.urlsafe_b64encode(b"{}").decode(),
+    base64.urlsafe_b64encode(b'["2026-01-02T03:04:05"]').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", "not-a-uuid"]').decode(),
+])
+def test_decode_cursor_rejects_invalid(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor, VIDEO_ORDER)
+    assert error.value.status_code == 400
@@ -0,0 +1,45 @@
+from datetime import datetime, timezone
+
+from sqlalchemy.dialects import postgresql
+
+from app.core import Video, EncodingJob
+from app.core.enum import VideoStatus, JobStatus
+from app.services.db_service import _upsert_values, _upsert_statement
+
+LOADED_AT = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _upsert_sql(model_class, dto) -> str:
+    return str(_upsert_statement(model_class, _upsert_values(model_class, dto)).compile(dialect=postgresql.dialect()))
+
+def _update_clause(sql: str) -> str:
+    return sql.split("DO UPDATE SET", 1)[1].split("RETURNING", 1)[0]
+
+
+def test_upsert_values_skip_database_timestamps():
+    # DB 에서 조회한 dto 처럼 이전 시각이 채워져 있어도 사용하지 않음
+    video = Video(s3_etag="etag", filename="a.mp4", original_path="upload/a.mp4", status=VideoStatus.READY,
+                  created_at=LOADED_AT, updated_at=LOADED_AT)
+    values = _upsert_values(Video, video)
+    assert "created_at" not in values and "updated_at" not in values
+    assert values["status"] == VideoStatus.READY
+
+def test_video_upsert_refreshes_updated_at():
+    video = Video(s3_etag="etag", filename="a.mp4", original_path="upload/a.mp4", status=VideoStatus.READY,
+                  created_at=LOADED_AT, updated_at=LOADED_AT)
+    update_clause = _update_clause(_upsert_sql(Video, video))
+    assert "updated_at = now()" in update_clause
+    assert "excluded.updated_at" not in update_clause
+    assert "created_at" not in update_clause
+    assert "status = excluded.status" in update_clause
+    # 충돌 키는 갱신하지 않음
+    assert "original_path" not in update_clause and "s3_etag" not in update_clause
+
+def test_job_upsert_refreshes_completed_at():
+    job = EncodingJob(status=JobStatus.SUCCESS, progress=100, started_at=LOADED_AT, completed_at=LOADED_AT)
+    sql = _upsert_sql(EncodingJob, job)
+    update_clause = _update_clause(sql)
+    assert "ON CONFLICT (id)" in sql
+    assert "completed_at = now()" in update_clause
+    assert "excluded.completed_at" not in update_clause
+    assert "started_at" not in update_clause
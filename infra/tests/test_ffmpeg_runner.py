@@ -0,0 +1,52 @@
+from app.worker.ffmpeg_runner import ProgressParser
+
+
+def _feed(parser, lines):
+    snapshots = [parser.feed(line) for line in lines]
+    return [snapshot for snapshot in snapshots if snapshot is not None]
+
+def test_progress_parser_returns_snapshot_per_block():
+    parser = ProgressParser()
+    snapshots = _feed(parser, [
+        "frame=120\n", "fps=59.94\n", "bitrate=2048.5kbits/s\n", "total_size=524288\n",
+        "out_time_us=4000000\n", "speed=1.99x\n", "progress=continue\n",
+    ])
+    assert len(snapshots) == 1
+    snapshot = snapshots[0]
+    assert snapshot.frame == 120
+    assert snapshot.fps == 59.94
+    assert snapshot.bitrate_kbps == 2048.5
+    assert snapshot.total_size == 524288
+    assert snapshot.out_seconds == 4.0
+    assert snapshot.speed == 1.99
+    assert not snapshot.ended
+
+def test_progress_parser_keeps_previous_values_for_na():
+    parser = ProgressParser()
+    _feed(parser, ["out_time_us=2000000", "speed=1.5x", "bitrate=900kbits/s", "progress=continue"])
+    snapshot, = _feed(parser, ["out_time_us=N/A", "speed=N/A", "bitrate=N/A", "progress=end"])
+    assert snapshot.out_time_us == 2000000
+    assert snapshot.speed == 1.5
+    assert snapshot.bitrate_kbps == 900
+    assert snapshot.ended
+
+def test_progress_parser_reads_legacy_out_time_ms_as_microseconds():
+    parser = ProgressParser()
+    snapshot, = _feed(parser, ["out_time_ms=3500000", "progress=continue"])
+    assert snapshot.out_seconds == 3.5
+
+def test_progress_parser_keeps_zero_out_time_us():
+    parser = ProgressParser()
+    snapshot, = _feed(parser, ["out_time_us=0", "out_time_ms=5000000", "progress=continue"])
+    assert snapshot.out_time_us == 0
+
+def test_progress_parser_snapshots_are_independent():
+    parser = ProgressParser()
+    first, = _feed(parser, ["frame=10", "progress=continue"])
+    second, = _feed(parser, ["frame=20", "progress=continue"])
+    assert (first.frame, second.frame) == (10, 20)
+
+def test_progress_parser_ignores_lines_without_value():
+    parser = ProgressParser()
+    assert parser.feed("\n") is None
+    assert parser.feed("garbage") is None
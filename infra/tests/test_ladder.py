@@ -0,0 +1,31 @@
+from app.worker.ladder import build_ladder
+
+
+def _sizes(ladder):
+    return [(rung["w"], rung["h"]) for rung in ladder]
+
+def test_build_ladder_stops_at_source_resolution():
+    ladder = build_ladder(1920, 1080)
+    assert _sizes(ladder) == [(640, 360), (1280, 720), (1920, 1080)]
+    assert [rung["index"] for rung in ladder] == [0, 1, 2]
+    assert ladder[-1]["v_bit"] == "5000k"
+
+def test_build_ladder_skips_steps_above_source():
+    # 2.39:1 원본: 짧은 변 804 < 1080 이라 1080 단계는 만들지 않고 비율만 유지
+    assert _sizes(build_ladder(1920, 804)) == [(860, 360), (1720, 720)]
+
+def test_build_ladder_small_source_keeps_one_rung():
+    assert _sizes(build_ladder(320, 180)) == [(320, 180)]
+
+def test_build_ladder_portrait_swaps_dimensions():
+    assert _sizes(build_ladder(1080, 1920)) == [(360, 640), (720, 1280), (1080, 1920)]
+
+def test_build_ladder_caps_video_bitrate_at_source():
+    top = build_ladder(1920, 1080, bit_rate=3_000_000)[-1]
+    assert top["v_bit"] == "3000k"
+    assert top["buf"] == "6000k"
+
+def test_build_ladder_scales_by_complexity():
+    ladder = build_ladder(1280, 720, complexity=0.5)
+    assert [rung["v_bit"] for rung in ladder] == ["400k", "1400k"]
+    assert [rung["buf"] for rung in ladder] == ["800k", "2800k"]
@@ -0,0 +1,58 @@
+import m3u8
+
+from app.worker.playlists import merge_master_playlists
+
+LOW_MASTER = """#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-STREAM-INF:BANDWIDTH=3520000,RESOLUTION=1280x720,CODECS="avc1.64001f,mp4a.40.2"
+1/index.m3u8
+#EXT-X-STREAM-INF:BANDWIDTH=985600,RESOLUTION=640x360,CODECS="avc1.64001e,mp4a.40.2"
+0/index.m3u8
+"""
+
+HIGH_MASTER = """#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-STREAM-INF:BANDWIDTH=5500000,AVERAGE-BANDWIDTH=5000000,RESOLUTION=1920x1080,CODECS="avc1.640028"
+2/index.m3u8
+"""
+
+GROUPED_MASTER = """#EXTM3U
+#EXT-X-VERSION:3
+#EXT-X-MEDIA:TYPE=AUDIO,GROUP-ID="aud",NAME="audio_0",DEFAULT=YES,AUTOSELECT=YES,URI="audio_0/index.m3u8"
+#EXT-X-STREAM-INF:BANDWIDTH=1020800,RESOLUTION=640x360,CODECS="avc1.64001e,mp4a.40.5",AUDIO="aud"
+0/index.m3u8
+"""
+
+
+def test_merge_sorts_variants_by_bandwidth():
+    merged = m3u8.loads(merge_master_playlists([HIGH_MASTER, LOW_MASTER]))
+    assert [playlist.uri for playlist in merged.playlists] == ["0/index.m3u8", "1/index.m3u8", "2/index.m3u8"]
+    assert not merged.media
+
+def test_merge_later_master_wins_for_same_uri():
+    updated = LOW_MASTER.replace("BANDWIDTH=985600", "BANDWIDTH=990000")
+    merged = m3u8.loads(merge_master_playlists([LOW_MASTER, updated]))
+    assert [playlist.stream_info.bandwidth for playlist in merged.playlists] == [990000, 3520000]
+
+def test_merge_attaches_audio_group_with_codec_and_bandwidth():
+    merged = m3u8.loads(merge_master_playlists([GROUPED_MASTER, HIGH_MASTER], audio_bandwidth=128000))
+    assert [media.name for media in merged.media] == ["audio_0"]
+
+    grouped, attached = merged.playlists
+    assert grouped.uri == "0/index.m3u8"
+    assert grouped.stream_info.bandwidth == 1020800
+    assert grouped.stream_info.codecs == "avc1.64001e,mp4a.40.5"
+
+    assert attached.uri == "2/index.m3u8"
+    assert attached.stream_info.audio == "aud"
+    # 그룹에서 찾은 오디오 코덱과 최대 오디오 비트레이트(+10%) 추가
+    assert attached.stream_info.codecs == "avc1.640028,mp4a.40.5"
+    assert attached.stream_info.bandwidth == 5500000 + 140800
+    assert attached.stream_info.average_bandwidth == 5000000 + 140800
+
+def test_merge_defaults_to_aac_when_group_codec_unknown():
+    grouped = GROUPED_MASTER.replace('CODECS="avc1.64001e,mp4a.40.5",', "")
+    merged = m3u8.loads(merge_master_playlists([grouped, HIGH_MASTER], audio_bandwidth=64000))
+    attached = merged.playlists[-1]
+    assert attached.stream_info.codecs == "avc1.640028,mp4a.40.2"
+    assert attached.stream_info.bandwidth == 5500000 + 70400
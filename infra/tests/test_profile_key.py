@@ -0,0 +1,51 @@
+from app.core.config import Settings
+from app.worker.probe import MediaInfo
+from app.worker.tasks import profile_key
+
+SHORT_720P = MediaInfo(duration=60, width=1280, height=720, fps=30, bit_rate=0, has_audio=True)
+SHORT_1080P = MediaInfo(duration=60, width=1920, height=1080, fps=30, bit_rate=0, has_audio=True)
+LONG_1080P = MediaInfo(duration=3600, width=1920, height=1080, fps=30, bit_rate=0, has_audio=True)
+
+
+def _defaults(monkeypatch):
+    monkeypatch.setattr(Settings, "CHUNKED_ENCODE", True)
+    monkeypatch.setattr(Settings, "CHUNK_MIN_DURATION", 600)
+    monkeypatch.setattr(Settings, "CHUNK_SECONDS", 120)
+    monkeypatch.setattr(Settings, "ENCODE_MODE", "single")
+    monkeypatch.setattr(Settings, "PROGRESSIVE_PUBLISH", True)
+    monkeypatch.setattr(Settings, "FAST_FIRST_MAX_HEIGHT", 720)
+
+def test_chunk_settings_ignored_for_short_videos(monkeypatch):
+    _defaults(monkeypatch)
+    before = profile_key(SHORT_1080P)
+    monkeypatch.setattr(Settings, "CHUNK_SECONDS", 60)
+    assert profile_key(SHORT_1080P) == before
+
+def test_chunk_settings_change_long_video_key(monkeypatch):
+    _defaults(monkeypatch)
+    before = profile_key(LONG_1080P)
+    monkeypatch.setattr(Settings, "CHUNK_SECONDS", 60)
+    assert profile_key(LONG_1080P) != before
+
+def test_progressive_ignored_without_higher_rungs(monkeypatch):
+    _defaults(monkeypatch)
+    before = profile_key(SHORT_720P)
+    monkeypatch.setattr(Settings, "PROGRESSIVE_PUBLISH", False)
+    assert profile_key(SHORT_720P) == before
+
+def test_progressive_changes_key_with_higher_rungs(monkeypatch):
+    _defaults(monkeypatch)
+    before = profile_key(SHORT_1080P)
+    monkeypatch.setattr(Settings, "PROGRESSIVE_PUBLISH", False)
+    assert profile_key(SHORT_1080P) != before
+
+def test_rendition_groups_only_in_rendition_mode(monkeypatch):
+    _defaults(monkeypatch)
+    before = profile_key(SHORT_1080P)
+    monkeypatch.setattr(Settings, "RENDITION_GROUPS", "0;1;2")
+    assert profile_key(SHORT_1080P) == before
+
+    monkeypatch.setattr(Settings, "ENCODE_MODE", "renditions")
+    grouped = profile_key(SHORT_1080P)
+    monkeypatch.setattr(Settings, "RENDITION_GROUPS", "0,1;2")
+    assert profile_key(SHORT_1080P) != grouped
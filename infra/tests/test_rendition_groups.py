@@ -0,0 +1,23 @@
+from app.core.config import Settings
+from app.worker.ladder import build_ladder
+from app.worker.tasks import rendition_groups
+
+
+def _indexes(groups):
+    return [[rung["index"] for rung in group] for group in groups]
+
+def test_rendition_groups_follow_setting(monkeypatch):
+    monkeypatch.setattr(Settings, "RENDITION_GROUPS", "0,1;2;3;4")
+    assert _indexes(rendition_groups(build_ladder(3840, 2160))) == [[0, 1], [2], [3], [4]]
+
+def test_rendition_groups_skip_missing_rungs(monkeypatch):
+    monkeypatch.setattr(Settings, "RENDITION_GROUPS", "0,1;2;3;4")
+    assert _indexes(rendition_groups(build_ladder(1280, 720))) == [[0, 1]]
+
+def test_rendition_groups_put_unlisted_rungs_alone(monkeypatch):
+    monkeypatch.setattr(Settings, "RENDITION_GROUPS", "2")
+    assert _indexes(rendition_groups(build_ladder(1920, 1080))) == [[2], [0], [1]]
+
+def test_rendition_groups_use_each_rung_once(monkeypatch):
+    monkeypatch.setattr(Settings, "RENDITION_GROUPS", "0,1;1,2; ")
+    assert _indexes(rendition_groups(build_ladder(1920, 1080))) == [[0, 1], [2]]
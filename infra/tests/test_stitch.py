@@ -0,0 +1,50 @@
+import m3u8
+
+from app.worker.tasks import stitch_variant_playlists
+
+
+def _ts_chunk(prefix: str, durations: list[float]) -> str:
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3", "#EXT-X-TARGETDURATION:2"]
+    for index, duration in enumerate(durations):
+        lines += [f"#EXTINF:{duration:.6f},", f"{prefix}_{index}.ts"]
+    return "\n".join(lines + ["#EXT-X-ENDLIST"]) + "\n"
+
+def _fmp4_chunk(prefix: str, sizes: list[int]) -> str:
+    lines = ["#EXTM3U", "#EXT-X-VERSION:7", "#EXT-X-TARGETDURATION:2",
+             f'#EXT-X-MAP:URI="{prefix}.mp4",BYTERANGE="800@0"']
+    offset = 800
+    for size in sizes:
+        lines += ["#EXTINF:2.000000,", f"#EXT-X-BYTERANGE:{size}@{offset}", f"{prefix}.mp4"]
+        offset += size
+    return "\n".join(lines + ["#EXT-X-ENDLIST"]) + "\n"
+
+
+def test_stitch_ts_chunks_in_order_with_discontinuity():
+    content = stitch_variant_playlists([_ts_chunk("c0", [2.0, 2.0]), _ts_chunk("c1", [2.0, 1.5])])
+    playlist = m3u8.loads(content)
+
+    assert [seg.uri for seg in playlist.segments] == ["c0_0.ts", "c0_1.ts", "c1_0.ts", "c1_1.ts"]
+    assert [seg.discontinuity for seg in playlist.segments] == [False, False, True, False]
+    assert playlist.version == 3
+    assert playlist.target_duration == 2
+    assert playlist.playlist_type == "vod"
+    assert playlist.is_endlist
+    assert content.count("#EXT-X-DISCONTINUITY") == 1
+
+def test_stitch_rounds_target_duration_up():
+    playlist = m3u8.loads(stitch_variant_playlists([_ts_chunk("c0", [2.0, 2.3])]))
+    assert playlist.target_duration == 3
+
+def test_stitch_fmp4_keeps_map_and_byteranges_per_chunk():
+    content = stitch_variant_playlists([_fmp4_chunk("c0", [1000, 1200]), _fmp4_chunk("c1", [900])])
+    playlist = m3u8.loads(content)
+
+    assert playlist.version == 7
+    assert [(seg.uri, seg.byterange) for seg in playlist.segments] == [
+        ("c0.mp4", "1000@800"), ("c0.mp4", "1200@1800"), ("c1.mp4", "900@800"),
+    ]
+    assert [seg.init_section.uri for seg in playlist.segments] == ["c0.mp4", "c0.mp4", "c1.mp4"]
+    assert content.count("#EXT-X-MAP") == 2
+    assert [seg.discontinuity for seg in playlist.segments] == [False, False, True]
+    # 청크 경계: DISCONTINUITY 뒤에 새 EXT-X-MAP
+    assert content.index("#EXT-X-DISCONTINUITY") < content.index('#EXT-X-MAP:URI="c1.mp4"')